@@ -0,0 +1,57 @@
+import time
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Per-process cache whose entries expire after a TTL.
+
+    Bounded by max_size, measured with size_of (one unit per entry by default,
+    or e.g. len for byte strings). When full, the oldest entries are evicted
+    first: dicts keep insertion order, so the first key is the oldest.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        size_of: Optional[Callable[[Any], int]] = None,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.size_of = size_of or (lambda value: 1)
+        self._entries: dict[Hashable, tuple[Any, float]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the value for key, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self.pop(key)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store value for ttl seconds (the cache's TTL by default)."""
+        size = self.size_of(value)
+        if size > self.max_size:
+            return
+        self.pop(key)
+        while self._entries and self._size + size > self.max_size:
+            self.pop(next(iter(self._entries)))
+        self._entries[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._size += size
+
+    def pop(self, key: Hashable) -> Optional[Any]:
+        """Remove key, returning its value (expired or not) or None."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._size -= self.size_of(entry[0])
+        return entry[0]
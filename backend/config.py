@@ -1,8 +1,13 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 
 
 class Settings(BaseSettings):
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        extra="ignore",  # Ignore extra env variables not defined here
+    )
+
     # MongoDB
     mongodb_uri: str = "mongodb://localhost:27017"
     mongodb_database: str = "mchacks2026"
@@ -21,6 +26,10 @@ class Settings(BaseSettings):
     # Session
     session_secret: str = "change-me-in-production"
     session_cookie_name: str = "session_id"
+    env: str = "development"  # "production" marks the session cookie Secure
+
+    # Logging
+    log_level: str = "INFO"  # e.g. "WARNING" in production to keep request paths quiet
 
     # CORS
     frontend_url: str = "http://localhost:3000"
@@ -29,9 +38,10 @@ class Settings(BaseSettings):
     elevenlabs_api_key: str = ""
     elevenlabs_voice_id: str = "21m00Tcm4TlvDq8ikWAM"  # Default: Rachel voice
 
-    class Config:
-        env_file = ".env"
-        extra = "ignore"  # Ignore extra env variables not defined here
+    # Video processing
+    video_encoder: str = ""  # e.g. "h264_nvenc"; empty = auto-detect
+    max_concurrent_exports: int = 2  # renders beyond this wait for a free slot
+    tmp_dir: str = ""  # export scratch space, e.g. "/dev/shm/exports"; empty = system temp dir
 
 
 @lru_cache()
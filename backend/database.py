@@ -1,36 +1,87 @@
+import logging
 import certifi
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import OperationFailure
 from config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 client: AsyncIOMotorClient = None
 db = None
+# Whether the unique (user_id, title) index exists; until it does, the
+# project routes check for duplicate titles themselves
+_unique_titles_indexed = False
 
 
 async def connect_to_mongo():
     global client, db
-    print(f"MongoDB URI: {settings.mongodb_uri[:50]}...")  # Print first 50 chars
+    logger.info("MongoDB URI: %s...", settings.mongodb_uri[:50])  # First 50 chars
     client = AsyncIOMotorClient(
         settings.mongodb_uri,
         serverSelectionTimeoutMS=5000,  # 5 second timeout
+        # Keep warm connections so requests after an idle spell don't pay the
+        # TLS handshake, and leave headroom for export/voiceover bursts
+        maxPoolSize=200,
+        minPoolSize=10,
+        maxIdleTimeMS=300_000,
         tlsCAFile=certifi.where(),
+        tz_aware=True,  # stored datetimes come back as UTC-aware, like the ones we write
     )
     db = client[settings.mongodb_database]
     # Test connection
     try:
         await client.admin.command('ping')
-        print(f"Connected to MongoDB: {settings.mongodb_database}")
+        logger.info("Connected to MongoDB: %s", settings.mongodb_database)
     except Exception as e:
-        print(f"MongoDB connection failed: {e}")
+        logger.error("MongoDB connection failed: %s", e)
+        return
+
+    try:
+        await create_indexes()
+    except Exception as e:
+        logger.error("Creating MongoDB indexes failed: %s", e)
+
+
+async def create_indexes():
+    """Create the indexes the hot queries rely on (no-op if they already exist)."""
+    # list_projects: a user's projects, or a session's unclaimed ones, newest first
+    await db.projects.create_index([("user_id", 1), ("updated_at", -1)])
+    await db.projects.create_index([("session_id", 1), ("user_id", 1), ("updated_at", -1)])
+    # list_assets filters on project_id + status and sorts by order;
+    # the project_id prefix also serves the asset count in get_upload_url
+    await db.assets.create_index([("project_id", 1), ("status", 1), ("order", 1)])
+    # get_export_history filters on project_id, newest first
+    await db.exports.create_index([("project_id", 1), ("created_at", -1)])
+    # get_export_status and the background job look exports up by export_id
+    await db.exports.create_index("export_id", unique=True)
+    # Signed-in users' project titles are unique (anonymous projects have
+    # user_id None and are left out). Created last, and on its own: it fails
+    # if existing data already has duplicates, and that shouldn't block the others.
+    global _unique_titles_indexed
+    try:
+        await db.projects.create_index(
+            [("user_id", 1), ("title", 1)],
+            unique=True,
+            partialFilterExpression={"user_id": {"$type": "string"}},
+        )
+        _unique_titles_indexed = True
+    except OperationFailure as e:
+        logger.error(
+            "Unique project title index not created (do users already have duplicate titles?): %s", e
+        )
 
 
 async def close_mongo_connection():
     global client
     if client:
         client.close()
-        print("Closed MongoDB connection")
+        logger.info("Closed MongoDB connection")
 
 
 def get_database():
     return db
+
+
+def unique_titles_indexed() -> bool:
+    return _unique_titles_indexed
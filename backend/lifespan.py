@@ -0,0 +1,23 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from config import get_settings
+from database import connect_to_mongo, close_mongo_connection
+from http_client import close_http_client
+from log_config import setup_logging, shutdown_logging
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown events shared by every app entry point."""
+    # Startup
+    setup_logging(settings.log_level.upper())
+    await connect_to_mongo()
+    yield
+    # Shutdown
+    await close_http_client()
+    await close_mongo_connection()
+    shutdown_logging()
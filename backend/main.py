@@ -1,29 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
 
 from config import get_settings
-from database import connect_to_mongo, close_mongo_connection
+from lifespan import lifespan
 from middleware import SessionMiddleware
 from routers import projects_router, assets_router, clips_router, voiceover_router
 
 settings = get_settings()
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
-    await connect_to_mongo()
-    yield
-    # Shutdown
-    await close_mongo_connection()
-
-
 app = FastAPI(
     title="MCHacks 2026 API",
     description="Backend API for video editing application",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
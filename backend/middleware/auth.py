@@ -1,43 +1,91 @@
-from fastapi import Depends, HTTPException, status, Request
+import asyncio
+import hashlib
+import logging
+import time
+from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 import httpx
-from functools import lru_cache
 from typing import Optional
+from cache import TTLCache
 from config import get_settings
+from http_client import get_http_client
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
+# Derived from settings once rather than on every request
+AUTH0_ISSUER = f"https://{settings.auth0_domain}/"
+AUTH0_JWKS_URL = f"https://{settings.auth0_domain}/.well-known/jwks.json"
 
-@lru_cache()
-def get_jwks():
+
+# Signing keys indexed by kid, refreshed after JWKS_TTL_SECONDS so Auth0 key
+# rotation is picked up without a restart. Fetches (including failed ones and
+# refetches for an unknown kid) happen at most every JWKS_MIN_REFETCH_SECONDS,
+# so an Auth0 outage or a bogus kid can't make every request wait on a fetch.
+JWKS_TTL_SECONDS = 3600
+JWKS_MIN_REFETCH_SECONDS = 30
+_jwks_cache: dict = {"keys": {}, "fetched_at": float("-inf"), "next_fetch_at": float("-inf")}
+_jwks_lock = asyncio.Lock()
+
+
+async def get_jwks() -> Optional[dict]:
     """Fetch Auth0 JWKS (JSON Web Key Set) for token verification."""
     if not settings.auth0_domain:
         return None
-    jwks_url = f"https://{settings.auth0_domain}/.well-known/jwks.json"
-    response = httpx.get(jwks_url)
+    response = await get_http_client().get(AUTH0_JWKS_URL, timeout=10.0)
+    response.raise_for_status()
     return response.json()
 
 
-def get_signing_key(token: str):
-    """Get the signing key from JWKS that matches the token's kid."""
-    jwks = get_jwks()
-    if not jwks:
-        return None
-
-    unverified_header = jwt.get_unverified_header(token)
-
-    for key in jwks.get("keys", []):
-        if key["kid"] == unverified_header["kid"]:
-            return {
+async def get_signing_keys(refresh: bool = False) -> dict[str, dict]:
+    """
+    Return the JWKS signing keys indexed by kid, refetching once the TTL
+    expires (or when refresh is set, e.g. for an unknown kid).
+    """
+    fetched_at = _jwks_cache["fetched_at"]
+    if not refresh and time.monotonic() - fetched_at < JWKS_TTL_SECONDS:
+        return _jwks_cache["keys"]
+
+    async with _jwks_lock:
+        # Another request may have refreshed the keys while we waited, or a
+        # fetch was attempted too recently to try again
+        if _jwks_cache["fetched_at"] != fetched_at or time.monotonic() < _jwks_cache["next_fetch_at"]:
+            return _jwks_cache["keys"]
+
+        _jwks_cache["next_fetch_at"] = time.monotonic() + JWKS_MIN_REFETCH_SECONDS
+        try:
+            jwks = await get_jwks()
+        except (httpx.HTTPError, ValueError) as e:
+            # Keep serving the previous keys rather than failing every request
+            logger.error("Error fetching Auth0 JWKS: %s", e)
+            return _jwks_cache["keys"]
+        if not jwks:
+            return {}
+
+        _jwks_cache["keys"] = {
+            key["kid"]: {
                 "kty": key["kty"],
                 "kid": key["kid"],
                 "use": key["use"],
                 "n": key["n"],
                 "e": key["e"],
             }
-    return None
+            for key in jwks.get("keys", [])
+        }
+        _jwks_cache["fetched_at"] = time.monotonic()
+        return _jwks_cache["keys"]
+
+
+async def get_signing_key(token: str):
+    """Get the signing key from JWKS that matches the token's kid."""
+    kid = jwt.get_unverified_header(token).get("kid")
+    signing_keys = await get_signing_keys()
+    if kid not in signing_keys:
+        # Auth0 may have rotated keys since the last fetch
+        signing_keys = await get_signing_keys(refresh=True)
+    return signing_keys.get(kid)
 
 
 class User:
@@ -46,6 +94,23 @@ class User:
         self.email = email
 
 
+# Verified tokens, keyed by SHA-256 of the token, so repeat requests with the
+# same bearer token skip the RSA signature check. Entries expire at the token's
+# own exp or after TOKEN_CACHE_TTL_SECONDS, whichever comes first.
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_TTL_SECONDS = 300
+_token_cache = TTLCache(ttl=TOKEN_CACHE_TTL_SECONDS, max_size=TOKEN_CACHE_MAX_SIZE)
+
+
+def cache_user(token_hash: bytes, user: User, exp: Optional[float]):
+    """Remember a verified token until it (or the cache entry) expires."""
+    ttl = TOKEN_CACHE_TTL_SECONDS
+    if exp is not None:
+        # exp is wall-clock time
+        ttl = min(ttl, exp - time.time())
+    _token_cache.set(token_hash, user, ttl=ttl)
+
+
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
 ) -> Optional[User]:
@@ -60,9 +125,14 @@ async def get_current_user(
         return None
 
     token = credentials.credentials
+    token_hash = hashlib.sha256(token.encode()).digest()
+
+    user = _token_cache.get(token_hash)
+    if user:
+        return user
 
     try:
-        signing_key = get_signing_key(token)
+        signing_key = await get_signing_key(token)
         if not signing_key:
             return None
 
@@ -71,7 +141,7 @@ async def get_current_user(
             signing_key,
             algorithms=settings.auth0_algorithms,
             audience=settings.auth0_audience,
-            issuer=f"https://{settings.auth0_domain}/",
+            issuer=AUTH0_ISSUER,
         )
 
         user_id = payload.get("sub")
@@ -80,7 +150,9 @@ async def get_current_user(
         if not user_id:
             return None
 
-        return User(user_id=user_id, email=email)
+        user = User(user_id=user_id, email=email)
+        cache_user(token_hash, user, payload.get("exp"))
+        return user
 
     except JWTError:
         return None
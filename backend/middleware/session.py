@@ -25,7 +25,7 @@ class SessionMiddleware(BaseHTTPMiddleware):
                 key=settings.session_cookie_name,
                 value=session_id,
                 httponly=True,
-                secure=False,  # Set to True in production with HTTPS
+                secure=settings.env == "production",
                 samesite="lax",
                 max_age=60 * 60 * 24 * 30,  # 30 days
             )
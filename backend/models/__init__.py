@@ -23,5 +23,6 @@ from .voiceover import (
     VoiceoverResponse,
     VoiceoverGenerate,
     VoiceoverConfirm,
+    VoiceoverUploadUrlRequest,
     VoiceoverUploadUrlResponse,
 )
@@ -1,9 +1,13 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 
 
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class ProjectStatus(str, Enum):
     DRAFT = "draft"
     PROCESSING = "processing"
@@ -48,16 +52,15 @@ class ProjectUpdate(BaseModel):
 
 
 class ProjectInDB(ProjectBase):
+    model_config = ConfigDict(populate_by_name=True)
+
     id: str = Field(alias="_id")
     user_id: Optional[str] = None  # None for anonymous projects
     session_id: Optional[str] = None  # For anonymous projects
     status: ProjectStatus = ProjectStatus.DRAFT
     clips: list[TimelineClip] = []
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
-
-    class Config:
-        populate_by_name = True
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 
 class ProjectResponse(ProjectBase):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -40,6 +40,12 @@ class VoiceoverConfirm(BaseModel):
     duration: Optional[float] = None
 
 
+class VoiceoverUploadUrlRequest(BaseModel):
+    """Optional details of the file to upload; when given, S3 enforces them."""
+    content_length: Optional[int] = Field(None, gt=0)  # Size in bytes
+    content_md5: Optional[str] = None  # Base64-encoded MD5 of the file
+
+
 class VoiceoverUploadUrlResponse(BaseModel):
     """Response with presigned upload URL."""
     upload_url: str
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from bson import ObjectId
+from fastapi import HTTPException, Request
+
+from cache import TTLCache
+from database import get_database
+from middleware import get_session_id, User
+
+# Project owners (user_id, session_id) cached per process, so handlers that only
+# need the access check skip the Mongo round trip on bursts of requests.
+# Kept short because other workers don't see invalidations (claim/delete).
+PROJECT_ACCESS_TTL_SECONDS = 15
+PROJECT_ACCESS_CACHE_MAX_SIZE = 4096
+_owner_cache = TTLCache(ttl=PROJECT_ACCESS_TTL_SECONDS, max_size=PROJECT_ACCESS_CACHE_MAX_SIZE)
+
+
+async def get_project_owner(project_id: str) -> tuple[ObjectId, Optional[str], Optional[str]]:
+    """Return (_id, user_id, session_id) of a project, raising 400/404 if invalid or missing."""
+    owner = _owner_cache.get(project_id)
+    if owner:
+        return owner
+
+    try:
+        object_id = ObjectId(project_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid project ID")
+
+    db = get_database()
+    project = await db.projects.find_one({"_id": object_id}, {"user_id": 1, "session_id": 1})
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    owner = (object_id, project.get("user_id"), project.get("session_id"))
+    _owner_cache.set(project_id, owner)
+    return owner
+
+
+async def require_project_access(project_id: str, request: Request, user: Optional[User]) -> ObjectId:
+    """
+    Raise 403 unless the project belongs to the user or (if anonymous) the session.
+    Returns the parsed project ObjectId so callers don't parse it again.
+    """
+    object_id, owner_user_id, owner_session_id = await get_project_owner(project_id)
+
+    if user and owner_user_id == user.user_id:
+        return object_id
+    if not owner_user_id and owner_session_id == get_session_id(request):
+        return object_id
+    raise HTTPException(status_code=403, detail="Access denied")
+
+
+def invalidate_project_owner(project_id: str):
+    """Drop a cached owner after the project is claimed or deleted."""
+    _owner_cache.pop(project_id)
@@ -2,15 +2,17 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from database import get_database
 from models import AssetCreate, AssetResponse, AssetConfirm, AssetStatus, AssetType, UploadUrlResponse
 from middleware import get_current_user, get_session_id, User
-from services.s3 import generate_presigned_upload_url, delete_file, get_s3_url, upload_file
+from project_access import require_project_access
+from services.s3 import generate_presigned_upload_url, delete_file, get_s3_url
 
 router = APIRouter(prefix="/projects/{project_id}/assets", tags=["assets"])
 
@@ -40,11 +42,15 @@ def asset_to_response(asset: dict) -> AssetResponse:
         asset_type=asset.get("asset_type", AssetType.VIDEO),
         status=asset.get("status", AssetStatus.PENDING),
         order=asset.get("order", 0),
-        created_at=asset.get("created_at", datetime.utcnow()),
-        updated_at=asset.get("updated_at", datetime.utcnow()),
+        created_at=asset.get("created_at") or datetime.now(timezone.utc),
+        updated_at=asset.get("updated_at") or datetime.now(timezone.utc),
     )
 
 
+# Project fields the handlers here read: access fields plus next_asset_order for get_upload_url
+PROJECT_PROJECTION = {"user_id": 1, "session_id": 1, "next_asset_order": 1}
+
+
 async def verify_project_access(
     project_id: str,
     request: Request,
@@ -58,8 +64,13 @@ async def verify_project_access(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid project ID")
 
-    project = await db.projects.find_one({"_id": object_id})
+    project = await db.projects.find_one({"_id": object_id}, PROJECT_PROJECTION)
+    check_project_access(project, request, user)
+    return project
+
 
+def check_project_access(project: Optional[dict], request: Request, user: Optional[User]):
+    """Raise 404/403 unless the project exists and belongs to the user or session."""
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
@@ -74,8 +85,6 @@ async def verify_project_access(
     if not has_access:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return project
-
 
 @router.post("/upload-url", response_model=UploadUrlResponse)
 async def get_upload_url(
@@ -98,24 +107,40 @@ async def get_upload_url(
         session_id = get_session_id(request)
         s3_prefix = f"anonymous/{session_id}/{project_id}"
 
-    # Get next asset order number
-    asset_count = await db.assets.count_documents({"project_id": ObjectId(project_id)})
+    # Get next asset order number from the project's counter ($inc is atomic,
+    # so concurrent uploads never share an order)
+    project_object_id = project["_id"]
+    if "next_asset_order" not in project:
+        # Projects created before the counter existed: seed it once from the count
+        asset_count = await db.assets.count_documents({"project_id": project_object_id})
+        await db.projects.update_one(
+            {"_id": project_object_id, "next_asset_order": {"$exists": False}},
+            {"$set": {"next_asset_order": asset_count}},
+        )
+    counter = await db.projects.find_one_and_update(
+        {"_id": project_object_id},
+        {"$inc": {"next_asset_order": 1}},
+        projection={"next_asset_order": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not counter:
+        raise HTTPException(status_code=404, detail="Project not found")
 
-    # Generate unique filename
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    # Generate unique filename (one timestamp for the key and the record)
+    now = datetime.now(timezone.utc)
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
     safe_filename = asset_data.filename.replace(" ", "_")
     s3_key = f"{s3_prefix}/{timestamp}_{safe_filename}"
 
     # Create pending asset record
-    now = datetime.utcnow()
     asset = {
-        "project_id": ObjectId(project_id),
+        "project_id": project_object_id,
         "filename": asset_data.filename,
         "s3_key": s3_key,
         "content_type": asset_data.content_type,
         "asset_type": get_asset_type(asset_data.content_type),
         "status": AssetStatus.PENDING,
-        "order": asset_count + 1,
+        "order": counter["next_asset_order"],
         "created_at": now,
         "updated_at": now,
     }
@@ -158,7 +183,7 @@ async def confirm_upload(
     Marks the asset as ready.
     Optionally accepts duration and size_bytes from the frontend.
     """
-    await verify_project_access(project_id, request, user)
+    project_object_id = await require_project_access(project_id, request, user)
     db = get_database()
 
     try:
@@ -166,24 +191,12 @@ async def confirm_upload(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid asset ID")
 
-    asset = await db.assets.find_one({
-        "_id": asset_object_id,
-        "project_id": ObjectId(project_id),
-    })
-
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
-
-    if asset["status"] == AssetStatus.READY:
-        return asset_to_response(asset)
-
-    # Update asset status and generate public URL
-    s3_url = get_s3_url(asset["s3_key"])
-
+    # Update asset status and generate public URL; the URL is built from the
+    # stored s3_key server-side so the whole confirm is one round trip
     update_data = {
         "status": AssetStatus.READY,
-        "s3_url": s3_url,
-        "updated_at": datetime.utcnow(),
+        "s3_url": {"$concat": [get_s3_url(""), "$s3_key"]},
+        "updated_at": datetime.now(timezone.utc),
     }
 
     # Add optional metadata from frontend
@@ -193,12 +206,23 @@ async def confirm_upload(
         if confirm_data.size_bytes is not None:
             update_data["size_bytes"] = confirm_data.size_bytes
 
-    await db.assets.update_one(
-        {"_id": asset_object_id},
-        {"$set": update_data}
+    asset_filter = {
+        "_id": asset_object_id,
+        "project_id": project_object_id,
+    }
+    updated_asset = await db.assets.find_one_and_update(
+        {**asset_filter, "status": {"$ne": AssetStatus.READY}},
+        [{"$set": update_data}],
+        return_document=ReturnDocument.AFTER,
     )
 
-    updated_asset = await db.assets.find_one({"_id": asset_object_id})
+    if not updated_asset:
+        # Either missing or already confirmed (confirming again is a no-op)
+        asset = await db.assets.find_one(asset_filter)
+        if not asset:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        return asset_to_response(asset)
+
     return asset_to_response(updated_asset)
 
 
@@ -206,19 +230,47 @@ async def confirm_upload(
 async def list_assets(
     project_id: str,
     request: Request,
+    limit: int = Query(100, ge=1, le=100),
+    after: Optional[int] = None,
     user: Optional[User] = Depends(get_current_user),
 ):
-    """List all assets for a project."""
-    await verify_project_access(project_id, request, user)
+    """
+    List assets for a project in timeline order.
+    Pass the `order` of the last asset received as `after` to get the next page.
+    """
     db = get_database()
 
-    cursor = db.assets.find({
-        "project_id": ObjectId(project_id),
-        "status": AssetStatus.READY,  # Only return confirmed uploads
-    }).sort("order", 1)
+    try:
+        object_id = ObjectId(project_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid project ID")
 
-    assets = await cursor.to_list(length=100)
-    return [asset_to_response(a) for a in assets]
+    asset_match = {"status": AssetStatus.READY}  # Only return confirmed uploads
+    if after is not None:
+        asset_match["order"] = {"$gt": after}
+
+    # Fetch the access fields and the assets in one round trip
+    # ($lookup with localField + pipeline needs MongoDB 5.0+)
+    cursor = db.projects.aggregate([
+        {"$match": {"_id": object_id}},
+        {"$project": {"user_id": 1, "session_id": 1}},
+        {"$lookup": {
+            "from": "assets",
+            "localField": "_id",
+            "foreignField": "project_id",
+            "pipeline": [
+                {"$match": asset_match},
+                {"$sort": {"order": 1}},
+                {"$limit": limit},
+            ],
+            "as": "assets",
+        }},
+    ])
+    projects = await cursor.to_list(length=1)
+
+    project = projects[0] if projects else None
+    check_project_access(project, request, user)
+    return [asset_to_response(a) for a in project["assets"]]
 
 
 @router.delete("/{asset_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -229,7 +281,7 @@ async def delete_asset(
     user: Optional[User] = Depends(get_current_user),
 ):
     """Delete an asset from S3 and MongoDB."""
-    await verify_project_access(project_id, request, user)
+    project_object_id = await require_project_access(project_id, request, user)
     db = get_database()
 
     try:
@@ -237,9 +289,10 @@ async def delete_asset(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid asset ID")
 
-    asset = await db.assets.find_one({
+    # Delete from MongoDB (returns the deleted document in the same round trip)
+    asset = await db.assets.find_one_and_delete({
         "_id": asset_object_id,
-        "project_id": ObjectId(project_id),
+        "project_id": project_object_id,
     })
 
     if not asset:
@@ -247,6 +300,3 @@ async def delete_asset(
 
     # Delete from S3
     await delete_file(asset["s3_key"])
-
-    # Delete from MongoDB
-    await db.assets.delete_one({"_id": asset_object_id})
@@ -4,17 +4,23 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import ReturnDocument
 import uuid
 
 from database import get_database
 from models import TimelineClip, ClipCreate, ClipUpdate
 from middleware import get_current_user, get_session_id, User
+from project_access import require_project_access
 
 router = APIRouter(prefix="/projects/{project_id}/clips", tags=["clips"])
 
 
+# Project fields the handlers here read: access fields plus the clips array
+PROJECT_PROJECTION = {"user_id": 1, "session_id": 1, "clips": 1}
+
+
 async def verify_project_access(
     project_id: str,
     request: Request,
@@ -28,7 +34,7 @@ async def verify_project_access(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid project ID")
 
-    project = await db.projects.find_one({"_id": object_id})
+    project = await db.projects.find_one({"_id": object_id}, PROJECT_PROJECTION)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -47,7 +53,7 @@ async def verify_project_access(
     return project
 
 
-async def verify_asset_exists(asset_id: str, project_id: str) -> dict:
+async def verify_asset_exists(asset_id: str, project_object_id: ObjectId) -> dict:
     """Verify the asset exists and belongs to the project."""
     db = get_database()
 
@@ -58,7 +64,7 @@ async def verify_asset_exists(asset_id: str, project_id: str) -> dict:
 
     asset = await db.assets.find_one({
         "_id": asset_object_id,
-        "project_id": ObjectId(project_id),
+        "project_id": project_object_id,
     })
 
     if not asset:
@@ -67,6 +73,27 @@ async def verify_asset_exists(asset_id: str, project_id: str) -> dict:
     return asset
 
 
+def validate_clip_times(clip_data: ClipCreate, asset: dict):
+    """Check a new clip's timestamps against each other and the asset duration."""
+    if clip_data.start_time < 0:
+        raise HTTPException(status_code=400, detail="start_time cannot be negative")
+    if clip_data.end_time <= clip_data.start_time:
+        raise HTTPException(status_code=400, detail="end_time must be greater than start_time")
+
+    # If asset has duration, validate end_time doesn't exceed it
+    if asset.get("duration") and clip_data.end_time > asset["duration"]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"end_time exceeds asset duration ({asset['duration']}s)"
+        )
+
+
+# The project keeps the highest clip order in max_clip_order, so orders are
+# assigned server-side in the same atomic update that appends the clips.
+# Projects created before the field existed fall back to max(clips.order).
+CURRENT_MAX_CLIP_ORDER = {"$ifNull": ["$max_clip_order", {"$ifNull": [{"$max": "$clips.order"}, 0]}]}
+
+
 @router.get("", response_model=list[TimelineClip])
 async def list_clips(
     project_id: str,
@@ -89,33 +116,21 @@ async def add_clip(
     user: Optional[User] = Depends(get_current_user),
 ):
     """Add a new clip to the project timeline."""
-    project = await verify_project_access(project_id, request, user)
+    project_object_id = await require_project_access(project_id, request, user)
 
     # Verify the asset exists
-    asset = await verify_asset_exists(clip_data.asset_id, project_id)
-
-    # Validate timestamps
-    if clip_data.start_time < 0:
-        raise HTTPException(status_code=400, detail="start_time cannot be negative")
-    if clip_data.end_time <= clip_data.start_time:
-        raise HTTPException(status_code=400, detail="end_time must be greater than start_time")
-
-    # If asset has duration, validate end_time doesn't exceed it
-    if asset.get("duration") and clip_data.end_time > asset["duration"]:
-        raise HTTPException(
-            status_code=400,
-            detail=f"end_time exceeds asset duration ({asset['duration']}s)"
-        )
+    asset = await verify_asset_exists(clip_data.asset_id, project_object_id)
+    validate_clip_times(clip_data, asset)
 
     db = get_database()
-    clips = project.get("clips", [])
 
-    # Determine order
     if clip_data.order is not None:
+        new_max = {"$max": [CURRENT_MAX_CLIP_ORDER, clip_data.order]}
         order = clip_data.order
     else:
         # Auto-assign to end of timeline
-        order = max([c.get("order", 0) for c in clips], default=0) + 1
+        new_max = {"$add": [CURRENT_MAX_CLIP_ORDER, 1]}
+        order = "$max_clip_order"  # read after the first stage sets it
 
     # Create clip
     new_clip = {
@@ -127,17 +142,104 @@ async def add_clip(
     }
 
     # Add to project
-    await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
-        {
-            "$push": {"clips": new_clip},
-            "$set": {"updated_at": datetime.utcnow()},
-        }
+    updated = await db.projects.find_one_and_update(
+        {"_id": project_object_id},
+        [
+            {"$set": {"max_clip_order": new_max, "updated_at": datetime.now(timezone.utc)}},
+            {"$set": {"clips": {"$concatArrays": [{"$ifNull": ["$clips", []]}, [new_clip]]}}},
+        ],
+        projection={"max_clip_order": 1},
+        return_document=ReturnDocument.AFTER,
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    if clip_data.order is None:
+        new_clip["order"] = updated["max_clip_order"]
 
     return TimelineClip(**new_clip)
 
 
+@router.post("/bulk", response_model=list[TimelineClip], status_code=status.HTTP_201_CREATED)
+async def add_clips(
+    project_id: str,
+    clips_data: list[ClipCreate],
+    request: Request,
+    user: Optional[User] = Depends(get_current_user),
+):
+    """
+    Add several clips to the timeline at once (e.g. when importing).
+    Clips without an order are appended in the given sequence.
+    """
+    project_object_id = await require_project_access(project_id, request, user)
+    if not clips_data:
+        return []
+
+    db = get_database()
+
+    # Verify all assets exist with a single query
+    try:
+        asset_object_ids = [ObjectId(clip_data.asset_id) for clip_data in clips_data]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid asset ID")
+
+    assets = await db.assets.find(
+        {"_id": {"$in": list(set(asset_object_ids))}, "project_id": project_object_id},
+        {"duration": 1},
+    ).to_list(None)
+    asset_map = {a["_id"]: a for a in assets}
+
+    for clip_data, asset_object_id in zip(clips_data, asset_object_ids):
+        asset = asset_map.get(asset_object_id)
+        if not asset:
+            raise HTTPException(status_code=404, detail="Asset not found in this project")
+        validate_clip_times(clip_data, asset)
+
+    # Auto-ordered clips go after both the timeline and any explicit orders in
+    # this batch: max_clip_order is raised by their count, and the k-th one
+    # gets (new max - count + k)
+    explicit_orders = [c.order for c in clips_data if c.order is not None]
+    auto_count = len(clips_data) - len(explicit_orders)
+    new_max = {"$add": [{"$max": [CURRENT_MAX_CLIP_ORDER, max(explicit_orders, default=0)]}, auto_count]}
+
+    new_clips = []
+    auto_index = 0
+    for clip_data in clips_data:
+        if clip_data.order is not None:
+            order = clip_data.order
+        else:
+            auto_index += 1
+            order = {"$add": ["$max_clip_order", auto_index - auto_count]}
+        new_clips.append({
+            "id": str(uuid.uuid4()),
+            "asset_id": clip_data.asset_id,
+            "start_time": clip_data.start_time,
+            "end_time": clip_data.end_time,
+            "order": order,
+        })
+
+    updated = await db.projects.find_one_and_update(
+        {"_id": project_object_id},
+        [
+            {"$set": {"max_clip_order": new_max, "updated_at": datetime.now(timezone.utc)}},
+            {"$set": {"clips": {"$concatArrays": [{"$ifNull": ["$clips", []]}, new_clips]}}},
+        ],
+        projection={"max_clip_order": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    first_auto_order = updated["max_clip_order"] - auto_count
+    auto_index = 0
+    for new_clip, clip_data in zip(new_clips, clips_data):
+        if clip_data.order is None:
+            auto_index += 1
+            new_clip["order"] = first_auto_order + auto_index
+
+    return [TimelineClip(**c) for c in new_clips]
+
+
 @router.patch("/{clip_id}", response_model=TimelineClip)
 async def update_clip(
     project_id: str,
@@ -180,12 +282,19 @@ async def update_clip(
     if not update_fields:
         return TimelineClip(**clip)
 
-    update_fields["updated_at"] = datetime.utcnow()
+    update_fields["updated_at"] = datetime.now(timezone.utc)
+    update = {"$set": update_fields}
+    if clip_data.order is not None:
+        # Keep max_clip_order ahead of every clip so auto-appended clips don't
+        # collide. Taken over all clips (this one already has its new order),
+        # since on older projects $max creates the field from this value.
+        highest_order = max(c.get("order", 0) for c in clips)
+        update["$max"] = {"max_clip_order": highest_order}
 
     db = get_database()
     await db.projects.update_one(
-        {"_id": ObjectId(project_id), "clips.id": clip_id},
-        {"$set": update_fields}
+        {"_id": project["_id"], "clips.id": clip_id},
+        update,
     )
 
     return TimelineClip(**clip)
@@ -209,10 +318,10 @@ async def delete_clip(
 
     db = get_database()
     await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": project["_id"]},
         {
             "$pull": {"clips": {"id": clip_id}},
-            "$set": {"updated_at": datetime.utcnow()},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
         }
     )
 
@@ -238,26 +347,33 @@ async def reorder_clips(
         if clip_id not in clip_map:
             raise HTTPException(status_code=400, detail=f"Clip {clip_id} not found")
 
-    # Check no clips are missing
-    if set(clip_ids) != set(clip_map.keys()):
+    # Check no clips are missing (or listed twice)
+    if len(clip_ids) != len(clip_map) or set(clip_ids) != set(clip_map.keys()):
         raise HTTPException(status_code=400, detail="clip_ids must include all clips")
 
-    # Update order
+    # Update each clip's order in place with one array filter per clip, so the
+    # clips array isn't rewritten (and concurrent edits to other fields survive)
     reordered_clips = []
+    order_updates = {}
+    array_filters = []
     for i, clip_id in enumerate(clip_ids):
         clip = clip_map[clip_id]
         clip["order"] = i + 1
         reordered_clips.append(clip)
+        order_updates[f"clips.$[c{i}].order"] = i + 1
+        array_filters.append({f"c{i}.id": clip_id})
 
     db = get_database()
     await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+        {"_id": project["_id"]},
         {
             "$set": {
-                "clips": reordered_clips,
-                "updated_at": datetime.utcnow(),
-            }
-        }
+                **order_updates,
+                "updated_at": datetime.now(timezone.utc),
+            },
+            "$max": {"max_clip_order": len(clip_ids)},
+        },
+        array_filters=array_filters or None,
     )
 
     return [TimelineClip(**c) for c in reordered_clips]
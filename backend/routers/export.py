@@ -2,22 +2,55 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import asyncio
+import logging
 import os
+import shutil
 import tempfile
 import uuid
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Request
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
-from typing import Optional
+from typing import Callable, Optional, Union
 from bson import ObjectId
+from fastapi.routing import APIRoute
+import orjson
 
+from config import get_settings
 from database import get_database
 from middleware import get_current_user, get_session_id, User
+from project_access import require_project_access
 from services.s3 import s3_service
 from services.video_processing import process_project_export
 from services.transcription import transcribe_audio
 
-router = APIRouter(prefix="/projects/{project_id}/export", tags=["export"])
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class ORJSONRequest(Request):
+    """Request whose JSON body is parsed with orjson."""
+
+    async def json(self):
+        if not hasattr(self, "_json"):
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so FastAPI still returns 422
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """Route that parses request bodies with orjson (export transcripts can be large)."""
+
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+
+        async def handler(request: Request) -> Response:
+            return await original_handler(ORJSONRequest(request.scope, request.receive))
+
+        return handler
+
+
+router = APIRouter(prefix="/projects/{project_id}/export", tags=["export"], route_class=ORJSONRoute)
 
 
 class ExportRequest(BaseModel):
@@ -40,6 +73,10 @@ class ExportStatusResponse(BaseModel):
     error: Optional[str] = None
 
 
+# Project fields the handlers here read: access fields plus the clips and voiceover
+PROJECT_PROJECTION = {"user_id": 1, "session_id": 1, "clips": 1, "voiceover": 1}
+
+
 async def verify_project_access(
     project_id: str,
     request: Request,
@@ -53,7 +90,7 @@ async def verify_project_access(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid project ID")
 
-    project = await db.projects.find_one({"_id": object_id})
+    project = await db.projects.find_one({"_id": object_id}, PROJECT_PROJECTION)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -72,22 +109,51 @@ async def verify_project_access(
     return project
 
 
-@router.post("", response_model=ExportResponse)
+def get_scratch_dir(expected_bytes: int) -> Optional[str]:
+    """
+    Parent directory for an export's temp files: settings.tmp_dir (e.g. a
+    RAM-backed tmpfs) when it has room, otherwise the system temp dir (None).
+    """
+    if not settings.tmp_dir:
+        return None
+    os.makedirs(settings.tmp_dir, exist_ok=True)
+    if shutil.disk_usage(settings.tmp_dir).free < expected_bytes:
+        logger.warning("[Export] Not enough space in %s, using system temp dir", settings.tmp_dir)
+        return None
+    return settings.tmp_dir
+
+
+async def auto_transcribe(audio_path: str) -> list[dict]:
+    """Transcribe the voiceover, falling back to no subtitles on failure."""
+    transcript_data = await transcribe_audio(audio_path)
+    if transcript_data:
+        logger.info("Transcription complete: %d segments", len(transcript_data))
+        return transcript_data
+    logger.warning("Transcription failed, proceeding without subtitles")
+    return []
+
+
+# Running export jobs; asyncio only keeps weak references to tasks, so hold
+# them here until they finish
+_export_tasks: set[asyncio.Task] = set()
+
+
+@router.post("", response_model=Union[ExportResponse, ExportStatusResponse])
 async def export_project(
     project_id: str,
     export_request: ExportRequest,
     request: Request,
+    response: Response,
+    background: bool = False,
     user: Optional[User] = Depends(get_current_user),
 ):
     """
     Export project video with subtitles.
 
-    Pipeline:
-    1. Get project clips from database
-    2. Download clips from S3 to temp directory
-    3. Merge clips and add subtitles
-    4. Upload result to S3
-    5. Return video URL
+    By default the request waits for the render and returns the video URL.
+    With ?background=true it returns 202 with the export_id straight away;
+    poll GET /export/{export_id}/status until it is completed (with a
+    video_url) or failed.
     """
     project = await verify_project_access(project_id, request, user)
     db = get_database()
@@ -106,62 +172,149 @@ async def export_project(
     ).to_list(None)
 
     asset_map = {str(a["_id"]): a for a in assets}
+    for clip in clips:
+        if clip["asset_id"] not in asset_map:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Asset not found for clip {clip['id']}"
+            )
 
-    # Create temp directory for processing (ignore cleanup errors on Windows)
-    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
-        clip_paths = []
-
-        # Download each clip from S3
-        for i, clip in enumerate(clips):
-            asset = asset_map.get(clip["asset_id"])
-            if not asset:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Asset not found for clip {clip['id']}"
-                )
-
-            s3_key = asset["s3_key"]
-            local_path = os.path.join(temp_dir, f"clip_{i}.mp4")
+    # Store the export record first so its status can be polled
+    export_id = str(uuid.uuid4())
+    created_at = datetime.now(timezone.utc)
+    await db.exports.insert_one({
+        "export_id": export_id,
+        "project_id": project_id,
+        "status": "pending",
+        "created_at": created_at,
+    })
+
+    task = asyncio.create_task(run_export(
+        export_id=export_id,
+        project_id=project_id,
+        clips=clips,
+        asset_map=asset_map,
+        voiceover=project.get("voiceover"),
+        transcript=export_request.transcript,
+    ))
+    _export_tasks.add(task)
+    task.add_done_callback(_export_tasks.discard)
+
+    if background:
+        response.status_code = status.HTTP_202_ACCEPTED
+        return ExportStatusResponse(export_id=export_id, status="pending")
+
+    # Shielded so a client disconnect doesn't cancel the render; the
+    # outcome is still recorded on the export record
+    result = await asyncio.shield(task)
+    if result["status"] != "completed":
+        raise HTTPException(status_code=500, detail=result["error"])
+
+    return ExportResponse(
+        export_id=export_id,
+        video_url=await s3_service.get_download_url(result["s3_key"]),
+        created_at=created_at,
+    )
+
+
+async def run_export(
+    export_id: str,
+    project_id: str,
+    clips: list[dict],
+    asset_map: dict[str, dict],
+    voiceover: Optional[dict],
+    transcript: list[dict],
+) -> dict:
+    """
+    Render an export and record the outcome on its export record.
+    Returns the fields it recorded (status plus s3_key or error).
 
-            # Download from S3
-            success = await s3_service.download_file(s3_key, local_path)
-            if not success:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to download clip {clip['id']}"
-                )
+    Pipeline:
+    1. Download clips from S3 to temp directory
+    2. Merge clips and add subtitles
+    3. Upload result to S3
+    4. Mark the export completed (or failed, with the error)
+    """
+    db = get_database()
+    await db.exports.update_one({"export_id": export_id}, {"$set": {"status": "processing"}})
 
-            clip_paths.append(local_path)
+    try:
+        s3_key = await render_export(export_id, project_id, clips, asset_map, voiceover, transcript)
+    except Exception as e:
+        logger.exception("[Export] Export %s failed", export_id)
+        outcome = {"status": "failed", "error": str(e)}
+        await db.exports.update_one({"export_id": export_id}, {"$set": outcome})
+        return outcome
+
+    outcome = {
+        "status": "completed",
+        "s3_key": s3_key,
+        "completed_at": datetime.now(timezone.utc),
+    }
+    await db.exports.update_one({"export_id": export_id}, {"$set": outcome})
+    logger.info("[Export] Export %s completed", export_id)
+    return outcome
+
+
+async def render_export(
+    export_id: str,
+    project_id: str,
+    clips: list[dict],
+    asset_map: dict[str, dict],
+    voiceover: Optional[dict],
+    transcript: list[dict],
+) -> str:
+    """Render the project video, upload it to S3 and return its S3 key."""
+    # Create temp directory for processing; it holds the clips plus the
+    # merged and final renders, so budget roughly three times the clip size
+    clip_bytes = sum(a.get("size_bytes") or 0 for a in asset_map.values())
+    temp_dir = tempfile.mkdtemp(prefix="export_", dir=get_scratch_dir(3 * clip_bytes))
+    transcription = None
+    try:
+        # Resolve each clip to its asset; clips sharing an asset share one download
+        local_paths: dict[str, str] = {}
+        clip_paths = []
+        for clip in clips:
+            s3_key = asset_map[clip["asset_id"]]["s3_key"]
+            if s3_key not in local_paths:
+                local_paths[s3_key] = os.path.join(temp_dir, f"clip_{len(local_paths)}.mp4")
+            clip_paths.append(local_paths[s3_key])
 
         # Check for voiceover audio (from project document)
         audio_path = None
-        voiceover = project.get("voiceover")
-        print(f"[Export] Project voiceover data: {voiceover}")
+        logger.debug("[Export] Project voiceover data: %s", voiceover)
+        downloads = [
+            s3_service.download_file(s3_key, path) for s3_key, path in local_paths.items()
+        ]
         if voiceover and voiceover.get("s3_key"):
             audio_path = os.path.join(temp_dir, "voiceover.m4a")
-            print(f"[Export] Downloading voiceover from S3: {voiceover['s3_key']}")
-            success = await s3_service.download_file(voiceover["s3_key"], audio_path)
+            logger.info("[Export] Downloading voiceover from S3: %s", voiceover["s3_key"])
+            downloads.append(s3_service.download_file(voiceover["s3_key"], audio_path))
+        else:
+            logger.info("[Export] No voiceover found in project")
+
+        # Download all clips and the voiceover from S3 concurrently
+        results = await asyncio.gather(*downloads)
+        for s3_key, success in zip(local_paths, results):
             if not success:
-                print("[Export] Failed to download voiceover from S3")
+                raise RuntimeError(f"Failed to download clip asset {s3_key}")
+
+        if audio_path:
+            if not results[-1]:
+                logger.warning("[Export] Failed to download voiceover from S3")
                 audio_path = None  # Continue without audio if download fails
             else:
-                print(f"[Export] Voiceover downloaded to: {audio_path}")
-        else:
-            print("[Export] No voiceover found in project")
+                logger.debug("[Export] Voiceover downloaded to: %s", audio_path)
 
-        # Auto-transcribe if no transcript provided but voiceover exists
-        transcript_data = export_request.transcript
+        # Auto-transcribe if no transcript provided but voiceover exists;
+        # the transcription runs while the clips are merged
+        transcript_data = transcript
         if not transcript_data and audio_path:
-            print("No transcript provided, auto-transcribing voiceover...")
-            transcript_data = await transcribe_audio(audio_path)
-            if transcript_data:
-                print(f"Transcription complete: {len(transcript_data)} segments")
-            else:
-                print("Transcription failed, proceeding without subtitles")
-                transcript_data = []
+            logger.info("No transcript provided, auto-transcribing voiceover...")
+            transcription = asyncio.create_task(auto_transcribe(audio_path))
+            transcript_data = transcription
 
         # Generate output path
-        export_id = str(uuid.uuid4())
         output_filename = f"export_{export_id}.mp4"
         output_path = os.path.join(temp_dir, output_filename)
 
@@ -174,57 +327,80 @@ async def export_project(
                 audio_path=audio_path,
             )
         except Exception as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Video processing failed: {str(e)}"
-            )
+            raise RuntimeError(f"Video processing failed: {str(e)}") from e
 
         # Upload to S3
         s3_key = f"exports/{project_id}/{output_filename}"
         upload_success = await s3_service.upload_file(output_path, s3_key)
         if not upload_success:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to upload exported video"
-            )
+            raise RuntimeError("Failed to upload exported video")
+
+        return s3_key
+    finally:
+        if transcription is not None:
+            # No-op once it has been awaited; otherwise (cancelled while queued
+            # for an export slot, failed before the merge) stop it here
+            transcription.cancel()
+            await asyncio.gather(transcription, return_exceptions=True)
+        # Downloaded clips and the render can be several GB; delete them off the
+        # event loop (errors ignored, e.g. files still locked on Windows)
+        await asyncio.to_thread(shutil.rmtree, temp_dir, ignore_errors=True)
+
+
+@router.get("/{export_id}/status", response_model=ExportStatusResponse)
+async def get_export_status(
+    project_id: str,
+    export_id: str,
+    request: Request,
+    user: Optional[User] = Depends(get_current_user),
+):
+    """Check the status of an export; video_url is set once it has completed."""
+    await require_project_access(project_id, request, user)
+    db = get_database()
 
-        # Get URL for the exported video
-        video_url = await s3_service.get_download_url(s3_key)
+    export = await db.exports.find_one({"export_id": export_id, "project_id": project_id})
+    if not export:
+        raise HTTPException(status_code=404, detail="Export not found")
 
-        # Store export record
-        export_record = {
-            "export_id": export_id,
-            "project_id": project_id,
-            "s3_key": s3_key,
-            "status": "completed",
-            "created_at": datetime.utcnow(),
-        }
-        await db.exports.insert_one(export_record)
+    video_url = None
+    if export.get("s3_key"):
+        video_url = await s3_service.get_download_url(export["s3_key"])
 
-        return ExportResponse(
-            export_id=export_id,
-            video_url=video_url,
-            created_at=export_record["created_at"],
-        )
+    return ExportStatusResponse(
+        export_id=export_id,
+        status=export.get("status", "completed"),
+        video_url=video_url,
+        error=export.get("error"),
+    )
 
 
 @router.get("/history")
 async def get_export_history(
     project_id: str,
     request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[datetime] = None,
     user: Optional[User] = Depends(get_current_user),
 ):
-    """Get list of previous exports for a project."""
-    await verify_project_access(project_id, request, user)
+    """
+    Get previous exports for a project, newest first.
+    Pass the `created_at` of the last export received as `before` to get the next page.
+    """
+    await require_project_access(project_id, request, user)
     db = get_database()
 
-    exports = await db.exports.find(
-        {"project_id": project_id}
-    ).sort("created_at", -1).to_list(20)
+    query = {"project_id": project_id}
+    if before is not None:
+        query["created_at"] = {"$lt": before}
+
+    exports = await db.exports.find(query).sort("created_at", -1).to_list(limit)
 
     result = []
     for exp in exports:
-        video_url = await s3_service.get_download_url(exp["s3_key"])
+        # Pending and failed exports have no video yet
+        video_url = None
+        if exp.get("s3_key"):
+            video_url = await s3_service.get_download_url(exp["s3_key"])
         result.append({
             "export_id": exp["export_id"],
             "status": exp.get("status", "completed"),
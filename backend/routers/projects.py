@@ -4,16 +4,43 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from database import get_database
+from database import get_database, unique_titles_indexed
 from models import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectStatus
 from middleware import get_current_user, get_session_id, User
+from project_access import invalidate_project_owner
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
+def raise_duplicate_title():
+    """Reject a title the user already uses for another project."""
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="A project with this title already exists"
+    )
+
+
+async def check_title_available(user_id: str, title: str, exclude_id: Optional[ObjectId] = None):
+    """
+    Raise 400 if the user already has a project with this title. Only needed
+    when the unique (user_id, title) index couldn't be created; otherwise the
+    write itself raises DuplicateKeyError.
+    """
+    if unique_titles_indexed():
+        return
+
+    query = {"user_id": user_id, "title": title}
+    if exclude_id is not None:
+        query["_id"] = {"$ne": exclude_id}  # Exclude current project
+    if await get_database().projects.find_one(query, {"_id": 1}):
+        raise_duplicate_title()
+
+
 def project_to_response(project: dict) -> ProjectResponse:
     """Convert MongoDB document to ProjectResponse."""
     return ProjectResponse(
@@ -22,8 +49,8 @@ def project_to_response(project: dict) -> ProjectResponse:
         user_id=project.get("user_id"),
         status=project.get("status", ProjectStatus.DRAFT),
         clips=project.get("clips", []),
-        created_at=project.get("created_at", datetime.utcnow()),
-        updated_at=project.get("updated_at", datetime.utcnow()),
+        created_at=project.get("created_at") or datetime.now(timezone.utc),
+        updated_at=project.get("updated_at") or datetime.now(timezone.utc),
     )
 
 
@@ -67,30 +94,28 @@ async def create_project(
     db = get_database()
     session_id = get_session_id(request)
 
-    # Check for duplicate title only for authenticated users
     if user:
-        existing = await db.projects.find_one({
-            "user_id": user.user_id,
-            "title": project_data.title,
-        })
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="A project with this title already exists"
-            )
-
-    now = datetime.utcnow()
+        await check_title_available(user.user_id, project_data.title)
+
+    now = datetime.now(timezone.utc)
     project = {
         "title": project_data.title,
         "user_id": user.user_id if user else None,
         "session_id": session_id if not user else None,
         "status": ProjectStatus.DRAFT,
         "clips": [],
+        "next_asset_order": 0,  # last asset order handed out, see get_upload_url
+        "max_clip_order": 0,  # highest clip order in the timeline, see add_clip
         "created_at": now,
         "updated_at": now,
     }
 
-    result = await db.projects.insert_one(project)
+    # Duplicate titles (authenticated users only) are rejected by the
+    # unique (user_id, title) index
+    try:
+        result = await db.projects.insert_one(project)
+    except DuplicateKeyError:
+        raise_duplicate_title()
     project["_id"] = result.inserted_id
 
     return project_to_response(project)
@@ -145,44 +170,35 @@ async def update_project(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid project ID")
 
-    project = await db.projects.find_one({"_id": object_id})
-
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    # Build update dict
+    update_data = {"updated_at": datetime.now(timezone.utc)}
+    if project_data.title is not None:
+        update_data["title"] = project_data.title
 
-    # Check access permission
+    # The access check is part of the filter, so load + update + reload is one
+    # round trip: the user's own projects, or unclaimed ones from this session
     session_id = get_session_id(request)
-    has_access = False
+    owner_filters = [{"user_id": None, "session_id": session_id}]
+    if user:
+        owner_filters.append({"user_id": user.user_id})
+        if project_data.title is not None:
+            await check_title_available(user.user_id, project_data.title, exclude_id=object_id)
 
-    if user and project.get("user_id") == user.user_id:
-        has_access = True
-    elif not project.get("user_id") and project.get("session_id") == session_id:
-        has_access = True
+    try:
+        updated_project = await db.projects.find_one_and_update(
+            {"_id": object_id, "$or": owner_filters},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        raise_duplicate_title()
 
-    if not has_access:
+    if not updated_project:
+        # Tell a missing project apart from someone else's
+        if not await db.projects.find_one({"_id": object_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Project not found")
         raise HTTPException(status_code=403, detail="Access denied")
 
-    # Check for duplicate title if updating title for authenticated user
-    if project_data.title is not None and user:
-        existing = await db.projects.find_one({
-            "user_id": user.user_id,
-            "title": project_data.title,
-            "_id": {"$ne": object_id},  # Exclude current project
-        })
-        if existing:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="A project with this title already exists"
-            )
-
-    # Build update dict
-    update_data = {"updated_at": datetime.utcnow()}
-    if project_data.title is not None:
-        update_data["title"] = project_data.title
-
-    await db.projects.update_one({"_id": object_id}, {"$set": update_data})
-
-    updated_project = await db.projects.find_one({"_id": object_id})
     return project_to_response(updated_project)
 
 
@@ -220,6 +236,7 @@ async def delete_project(
     # TODO: Also delete clips from S3
 
     await db.projects.delete_one({"_id": object_id})
+    invalidate_project_owner(project_id)
 
 
 @router.post("/{project_id}/claim", response_model=ProjectResponse)
@@ -244,30 +261,37 @@ async def claim_project(
 
     session_id = get_session_id(request)
 
-    # Find the anonymous project belonging to this session
-    project = await db.projects.find_one({
-        "_id": object_id,
-        "session_id": session_id,
-        "user_id": None,
-    })
+    if not unique_titles_indexed():
+        project = await db.projects.find_one({"_id": object_id}, {"title": 1})
+        if project:
+            await check_title_available(user.user_id, project.get("title", "Untitled Project"))
 
-    if not project:
+    # Claim the anonymous project belonging to this session (fails if the
+    # user already has a project with this title)
+    try:
+        updated_project = await db.projects.find_one_and_update(
+            {
+                "_id": object_id,
+                "session_id": session_id,
+                "user_id": None,
+            },
+            {
+                "$set": {
+                    "user_id": user.user_id,
+                    "session_id": None,
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            },
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        raise_duplicate_title()
+
+    if not updated_project:
         raise HTTPException(
             status_code=404,
             detail="Project not found or already claimed"
         )
 
-    # Claim the project
-    await db.projects.update_one(
-        {"_id": object_id},
-        {
-            "$set": {
-                "user_id": user.user_id,
-                "session_id": None,
-                "updated_at": datetime.utcnow(),
-            }
-        }
-    )
-
-    updated_project = await db.projects.find_one({"_id": object_id})
+    invalidate_project_owner(project_id)
     return project_to_response(updated_project)
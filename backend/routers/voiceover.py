@@ -2,10 +2,12 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request, UploadFile, File
+import logging
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, UploadFile, File
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
+from pymongo import ReturnDocument
 
 from database import get_database
 from models import (
@@ -13,15 +15,22 @@ from models import (
     VoiceoverResponse,
     VoiceoverGenerate,
     VoiceoverConfirm,
+    VoiceoverUploadUrlRequest,
     VoiceoverUploadUrlResponse,
 )
 from middleware import get_current_user, get_session_id, User
-from services.s3 import generate_presigned_upload_url, upload_file, delete_file, get_s3_url
+from project_access import require_project_access
+from services.s3 import generate_presigned_upload_url, upload_file, upload_fileobj, delete_file, get_s3_url
 from services.elevenlabs import generate_speech
 
+logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/projects/{project_id}/voiceover", tags=["voiceover"])
 
 
+# Project fields the handlers here read: access fields plus the voiceover
+PROJECT_PROJECTION = {"user_id": 1, "session_id": 1, "voiceover": 1}
+
+
 async def verify_project_access(
     project_id: str,
     request: Request,
@@ -35,7 +44,7 @@ async def verify_project_access(
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid project ID")
 
-    project = await db.projects.find_one({"_id": object_id})
+    project = await db.projects.find_one({"_id": object_id}, PROJECT_PROJECTION)
 
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
@@ -62,6 +71,41 @@ def get_voiceover_s3_prefix(project_id: str, user: Optional[User], session_id: s
         return f"anonymous/{session_id}/{project_id}/voiceover"
 
 
+async def save_voiceover(project_object_id: ObjectId, voiceover: dict) -> Optional[dict]:
+    """Set the project's voiceover, returning the one it replaced (if any)."""
+    db = get_database()
+    # The pre-update document says which file the new voiceover replaced
+    project = await db.projects.find_one_and_update(
+        {"_id": project_object_id},
+        {
+            "$set": {
+                "voiceover": voiceover,
+                "updated_at": voiceover["created_at"],
+            }
+        },
+        projection={"voiceover": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project.get("voiceover")
+
+
+def delete_replaced_voiceover(
+    background_tasks: BackgroundTasks,
+    old_voiceover: Optional[dict],
+    new_s3_key: str,
+):
+    """
+    Delete the replaced voiceover's file from S3 after the response is sent.
+    Only called once the new file is uploaded and saved, so a failed
+    replacement never leaves the project pointing at a deleted file. Keys
+    have one-second resolution, so a replacement can reuse the old key.
+    """
+    if old_voiceover and old_voiceover["s3_key"] != new_s3_key:
+        background_tasks.add_task(delete_file, old_voiceover["s3_key"])
+
+
 @router.get("", response_model=Optional[VoiceoverResponse])
 async def get_voiceover(
     project_id: str,
@@ -88,23 +132,27 @@ async def get_voiceover(
 async def get_upload_url(
     project_id: str,
     request: Request,
+    upload_data: Optional[VoiceoverUploadUrlRequest] = None,
     user: Optional[User] = Depends(get_current_user),
 ):
     """
     Get a presigned URL for uploading a voiceover (recorded or file upload).
+    The client PUTs the file straight to S3, then calls /confirm with the s3_key.
     """
-    await verify_project_access(project_id, request, user)
+    await require_project_access(project_id, request, user)
 
     session_id = get_session_id(request)
     s3_prefix = get_voiceover_s3_prefix(project_id, user, session_id)
 
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     s3_key = f"{s3_prefix}/{timestamp}_voiceover.mp3"
 
     upload_url = await generate_presigned_upload_url(
         s3_key=s3_key,
         content_type="audio/mpeg",
         expiration=3600,
+        content_length=upload_data.content_length if upload_data else None,
+        content_md5=upload_data.content_md5 if upload_data else None,
     )
 
     if not upload_url:
@@ -116,41 +164,37 @@ async def get_upload_url(
     )
 
 
-@router.post("/upload", response_model=VoiceoverResponse)
+@router.post("/upload", response_model=VoiceoverResponse, deprecated=True)
 async def upload_voiceover_direct(
     project_id: str,
     request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user: Optional[User] = Depends(get_current_user),
 ):
     """
     Direct upload endpoint for voiceover files.
     Accepts the file directly and uploads to S3 from the backend.
-    """
-    project = await verify_project_access(project_id, request, user)
-    db = get_database()
-
-    # Read file content
-    file_content = await file.read()
 
-    # Delete old voiceover from S3 if exists
-    old_voiceover = project.get("voiceover")
-    if old_voiceover:
-        await delete_file(old_voiceover["s3_key"])
+    Deprecated: use /upload-url, PUT the file to S3, then /confirm, so the
+    audio doesn't pass through the backend.
+    """
+    project_object_id = await require_project_access(project_id, request, user)
 
     # Build S3 key
     session_id = get_session_id(request)
     s3_prefix = get_voiceover_s3_prefix(project_id, user, session_id)
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    now = datetime.now(timezone.utc)
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
 
     # Get file extension from original filename
     ext = Path(file.filename).suffix if file.filename else ".m4a"
     s3_key = f"{s3_prefix}/{timestamp}_voiceover{ext}"
 
-    # Upload to S3
+    # Upload to S3, streaming from the spooled request body
     content_type = file.content_type or "audio/mp4"
-    s3_url = await upload_file(
-        file_content=file_content,
+    s3_url = await upload_fileobj(
+        fileobj=file.file,
         s3_key=s3_key,
         content_type=content_type,
     )
@@ -158,7 +202,6 @@ async def upload_voiceover_direct(
     if not s3_url:
         raise HTTPException(status_code=500, detail="Failed to upload voiceover to S3")
 
-    now = datetime.utcnow()
     voiceover = {
         "source": VoiceoverSource.UPLOADED,
         "s3_key": s3_key,
@@ -168,19 +211,11 @@ async def upload_voiceover_direct(
         "created_at": now,
     }
 
-    print(f"[Voiceover Upload] Saving voiceover to project {project_id}")
-    print(f"[Voiceover Upload] s3_key: {s3_key}")
+    logger.info("[Voiceover Upload] Saving voiceover to project %s", project_id)
+    logger.debug("[Voiceover Upload] s3_key: %s", s3_key)
 
-    result = await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
-        {
-            "$set": {
-                "voiceover": voiceover,
-                "updated_at": now,
-            }
-        }
-    )
-    print(f"[Voiceover Upload] Update result - matched: {result.matched_count}, modified: {result.modified_count}")
+    old_voiceover = await save_voiceover(project_object_id, voiceover)
+    delete_replaced_voiceover(background_tasks, old_voiceover, s3_key)
 
     return VoiceoverResponse(
         source=voiceover["source"],
@@ -196,6 +231,7 @@ async def confirm_upload(
     project_id: str,
     s3_key: str,
     request: Request,
+    background_tasks: BackgroundTasks,
     confirm_data: Optional[VoiceoverConfirm] = None,
     user: Optional[User] = Depends(get_current_user),
 ):
@@ -203,15 +239,9 @@ async def confirm_upload(
     Confirm that a voiceover has been uploaded to S3.
     Replaces any existing voiceover.
     """
-    project = await verify_project_access(project_id, request, user)
-    db = get_database()
-
-    # Delete old voiceover from S3 if exists
-    old_voiceover = project.get("voiceover")
-    if old_voiceover:
-        await delete_file(old_voiceover["s3_key"])
+    project_object_id = await require_project_access(project_id, request, user)
 
-    now = datetime.utcnow()
+    now = datetime.now(timezone.utc)
     source = confirm_data.source if confirm_data else VoiceoverSource.UPLOADED
 
     voiceover = {
@@ -223,15 +253,8 @@ async def confirm_upload(
         "created_at": now,
     }
 
-    await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
-        {
-            "$set": {
-                "voiceover": voiceover,
-                "updated_at": now,
-            }
-        }
-    )
+    old_voiceover = await save_voiceover(project_object_id, voiceover)
+    delete_replaced_voiceover(background_tasks, old_voiceover, s3_key)
 
     return VoiceoverResponse(
         source=voiceover["source"],
@@ -247,14 +270,14 @@ async def generate_voiceover(
     project_id: str,
     generate_data: VoiceoverGenerate,
     request: Request,
+    background_tasks: BackgroundTasks,
     user: Optional[User] = Depends(get_current_user),
 ):
     """
     Generate a voiceover from text using ElevenLabs.
     Replaces any existing voiceover.
     """
-    project = await verify_project_access(project_id, request, user)
-    db = get_database()
+    project_object_id = await require_project_access(project_id, request, user)
 
     if not generate_data.text.strip():
         raise HTTPException(status_code=400, detail="Text cannot be empty")
@@ -268,15 +291,11 @@ async def generate_voiceover(
             detail="Failed to generate voiceover. Check ElevenLabs configuration."
         )
 
-    # Delete old voiceover from S3 if exists
-    old_voiceover = project.get("voiceover")
-    if old_voiceover:
-        await delete_file(old_voiceover["s3_key"])
-
     # Upload to S3
     session_id = get_session_id(request)
     s3_prefix = get_voiceover_s3_prefix(project_id, user, session_id)
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    now = datetime.now(timezone.utc)
+    timestamp = now.strftime("%Y%m%d_%H%M%S")
     s3_key = f"{s3_prefix}/{timestamp}_generated.mp3"
 
     s3_url = await upload_file(
@@ -288,7 +307,6 @@ async def generate_voiceover(
     if not s3_url:
         raise HTTPException(status_code=500, detail="Failed to upload voiceover to S3")
 
-    now = datetime.utcnow()
     voiceover = {
         "source": VoiceoverSource.GENERATED,
         "s3_key": s3_key,
@@ -298,15 +316,8 @@ async def generate_voiceover(
         "created_at": now,
     }
 
-    await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
-        {
-            "$set": {
-                "voiceover": voiceover,
-                "updated_at": now,
-            }
-        }
-    )
+    old_voiceover = await save_voiceover(project_object_id, voiceover)
+    delete_replaced_voiceover(background_tasks, old_voiceover, s3_key)
 
     return VoiceoverResponse(
         source=voiceover["source"],
@@ -324,21 +335,21 @@ async def delete_voiceover(
     user: Optional[User] = Depends(get_current_user),
 ):
     """Delete the voiceover from this project."""
-    project = await verify_project_access(project_id, request, user)
+    project_object_id = await require_project_access(project_id, request, user)
     db = get_database()
 
-    voiceover = project.get("voiceover")
-    if not voiceover:
-        raise HTTPException(status_code=404, detail="No voiceover found")
-
-    # Delete from S3
-    await delete_file(voiceover["s3_key"])
-
-    # Remove from project
-    await db.projects.update_one(
-        {"_id": ObjectId(project_id)},
+    # Remove from project, getting the removed voiceover back in the same call
+    project = await db.projects.find_one_and_update(
+        {"_id": project_object_id, "voiceover": {"$exists": True}},
         {
             "$unset": {"voiceover": ""},
-            "$set": {"updated_at": datetime.utcnow()},
-        }
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+        },
+        projection={"voiceover": 1},
+        return_document=ReturnDocument.BEFORE,
     )
+    if not project:
+        raise HTTPException(status_code=404, detail="No voiceover found")
+
+    # Delete from S3
+    await delete_file(project["voiceover"]["s3_key"])
@@ -1,11 +1,33 @@
+import hashlib
+import json
+import logging
 import httpx
 from typing import Optional
+from cache import TTLCache
 from config import get_settings
+from http_client import get_http_client
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 ELEVENLABS_API_URL = "https://api.elevenlabs.io/v1"
 
+# Per-call request constants
+API_HEADERS = {"xi-api-key": settings.elevenlabs_api_key}
+TTS_HEADERS = {**API_HEADERS, "Accept": "audio/mpeg"}
+TTS_MODEL_ID = "eleven_monolingual_v1"
+TTS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.5,
+}
+
+# Generated audio keyed by a hash of the request, so regenerating the same
+# script (common while iterating) is instant and not billed again.
+# Bounded by total size since each entry is a whole MP3.
+TTS_CACHE_TTL_SECONDS = 24 * 3600
+TTS_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_tts_cache = TTLCache(ttl=TTS_CACHE_TTL_SECONDS, max_size=TTS_CACHE_MAX_BYTES, size_of=len)
+
 
 async def generate_speech(text: str, voice_id: Optional[str] = None) -> Optional[bytes]:
     """
@@ -13,43 +35,42 @@ async def generate_speech(text: str, voice_id: Optional[str] = None) -> Optional
     Returns audio bytes (MP3 format) or None if failed.
     """
     if not settings.elevenlabs_api_key:
-        print("ElevenLabs API key not configured")
+        logger.warning("ElevenLabs API key not configured")
         return None
 
     voice = voice_id or settings.elevenlabs_voice_id
 
     url = f"{ELEVENLABS_API_URL}/text-to-speech/{voice}"
 
-    headers = {
-        "Accept": "audio/mpeg",
-        "Content-Type": "application/json",
-        "xi-api-key": settings.elevenlabs_api_key,
-    }
-
     payload = {
         "text": text,
-        "model_id": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.5,
-        }
+        "model_id": TTS_MODEL_ID,
+        "voice_settings": TTS_VOICE_SETTINGS,
     }
 
+    cache_key = hashlib.sha256(
+        json.dumps({"voice_id": voice, **payload}, sort_keys=True).encode()
+    ).hexdigest()
+    cached = _tts_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Reusing cached ElevenLabs audio for identical request")
+        return cached
+
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(url, json=payload, headers=headers)
+        response = await get_http_client().post(url, json=payload, headers=TTS_HEADERS)
 
-            if response.status_code == 200:
-                return response.content
-            else:
-                print(f"ElevenLabs API error: {response.status_code} - {response.text}")
-                return None
+        if response.status_code == 200:
+            _tts_cache.set(cache_key, response.content)
+            return response.content
+        else:
+            logger.error("ElevenLabs API error: %s - %s", response.status_code, response.text)
+            return None
 
     except httpx.TimeoutException:
-        print("ElevenLabs API timeout")
+        logger.error("ElevenLabs API timeout")
         return None
     except Exception as e:
-        print(f"ElevenLabs API error: {e}")
+        logger.error("ElevenLabs API error: %s", e)
         return None
 
 
@@ -63,24 +84,19 @@ async def get_available_voices() -> list[dict]:
 
     url = f"{ELEVENLABS_API_URL}/voices"
 
-    headers = {
-        "xi-api-key": settings.elevenlabs_api_key,
-    }
-
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=headers)
-
-            if response.status_code == 200:
-                data = response.json()
-                return [
-                    {"id": v["voice_id"], "name": v["name"]}
-                    for v in data.get("voices", [])
-                ]
-            else:
-                print(f"ElevenLabs API error: {response.status_code}")
-                return []
+        response = await get_http_client().get(url, headers=API_HEADERS, timeout=30.0)
+
+        if response.status_code == 200:
+            data = response.json()
+            return [
+                {"id": v["voice_id"], "name": v["name"]}
+                for v in data.get("voices", [])
+            ]
+        else:
+            logger.error("ElevenLabs API error: %s", response.status_code)
+            return []
 
     except Exception as e:
-        print(f"ElevenLabs API error: {e}")
+        logger.error("ElevenLabs API error: %s", e)
         return []
@@ -1,13 +1,51 @@
+import asyncio
+import logging
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional
+from functools import lru_cache
+from typing import BinaryIO, Optional
+from cache import TTLCache
 from config import get_settings
 
 settings = get_settings()
-
-
+logger = logging.getLogger(__name__)
+
+# boto3 is blocking: network calls below run in worker threads via asyncio.to_thread
+# so they don't stall the event loop. Presigning is local and stays inline.
+
+# Exports fetch every clip at once; cap in-flight downloads so large projects
+# don't open dozens of multipart transfers at the same time. Each transfer uses
+# several connections, so the pool is raised well above boto3's default of 10.
+MAX_CONCURRENT_DOWNLOADS = 8
+_download_slots = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=64,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+    tcp_keepalive=True,
+)
+# Multipart settings for clip/export transfers (16 MB parts, 10 threads per file)
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=10,
+    io_chunksize=256 * 1024,
+)
+
+# Presigned download URLs, reused until PRESIGN_REUSE_FRACTION of their validity
+# has passed so repeated listings don't re-sign the same keys
+PRESIGN_CACHE_MAX_SIZE = 10_000
+PRESIGN_REUSE_FRACTION = 0.8
+_presign_cache = TTLCache(ttl=0, max_size=PRESIGN_CACHE_MAX_SIZE)  # TTL set per URL
+
+
+@lru_cache()
 def get_s3_client():
-    """Get S3 client with configured credentials."""
+    """
+    Get the shared S3 client (boto3 clients are thread-safe), so requests
+    reuse its connection pool instead of opening new TLS connections.
+    """
     if not settings.aws_access_key_id or not settings.aws_secret_access_key:
         return None
 
@@ -16,6 +54,7 @@ def get_s3_client():
         aws_access_key_id=settings.aws_access_key_id,
         aws_secret_access_key=settings.aws_secret_access_key,
         region_name=settings.aws_region,
+        config=S3_CLIENT_CONFIG,
     )
 
 
@@ -33,7 +72,8 @@ async def upload_file(
         return None
 
     try:
-        client.put_object(
+        await asyncio.to_thread(
+            client.put_object,
             Bucket=settings.aws_s3_bucket,
             Key=s3_key,
             Body=file_content,
@@ -41,7 +81,36 @@ async def upload_file(
         )
         return f"https://{settings.aws_s3_bucket}.s3.{settings.aws_region}.amazonaws.com/{s3_key}"
     except ClientError as e:
-        print(f"Error uploading to S3: {e}")
+        logger.error("Error uploading to S3: %s", e)
+        return None
+
+
+async def upload_fileobj(
+    fileobj: BinaryIO,
+    s3_key: str,
+    content_type: str = "video/mp4",
+) -> Optional[str]:
+    """
+    Upload a file-like object to S3, reading it in chunks (multipart when large)
+    instead of holding it in memory.
+    Returns the S3 URL if successful, None otherwise.
+    """
+    client = get_s3_client()
+    if not client:
+        return None
+
+    try:
+        await asyncio.to_thread(
+            client.upload_fileobj,
+            fileobj,
+            settings.aws_s3_bucket,
+            s3_key,
+            ExtraArgs={"ContentType": content_type},
+            Config=TRANSFER_CONFIG,
+        )
+        return get_s3_url(s3_key)
+    except ClientError as e:
+        logger.error("Error uploading to S3: %s", e)
         return None
 
 
@@ -52,10 +121,10 @@ async def delete_file(s3_key: str) -> bool:
         return False
 
     try:
-        client.delete_object(Bucket=settings.aws_s3_bucket, Key=s3_key)
+        await asyncio.to_thread(client.delete_object, Bucket=settings.aws_s3_bucket, Key=s3_key)
         return True
     except ClientError as e:
-        print(f"Error deleting from S3: {e}")
+        logger.error("Error deleting from S3: %s", e)
         return False
 
 
@@ -69,6 +138,11 @@ async def generate_presigned_url(
     - for_upload=False: generates download URL
     - for_upload=True: generates upload URL
     """
+    if not for_upload:
+        cached = _presign_cache.get((s3_key, expiration))
+        if cached:
+            return cached
+
     client = get_s3_client()
     if not client:
         return None
@@ -86,9 +160,10 @@ async def generate_presigned_url(
                 Params={"Bucket": settings.aws_s3_bucket, "Key": s3_key},
                 ExpiresIn=expiration,
             )
+            _presign_cache.set((s3_key, expiration), url, ttl=expiration * PRESIGN_REUSE_FRACTION)
         return url
     except ClientError as e:
-        print(f"Error generating presigned URL: {e}")
+        logger.error("Error generating presigned URL: %s", e)
         return None
 
 
@@ -96,25 +171,37 @@ async def generate_presigned_upload_url(
     s3_key: str,
     content_type: str = "video/mp4",
     expiration: int = 3600,
+    content_length: Optional[int] = None,
+    content_md5: Optional[str] = None,
 ) -> Optional[str]:
-    """Generate a presigned URL specifically for uploading."""
+    """
+    Generate a presigned URL specifically for uploading.
+    content_length/content_md5 are signed into the URL when given, so S3
+    rejects a PUT whose body doesn't match.
+    """
     client = get_s3_client()
     if not client:
         return None
 
+    params = {
+        "Bucket": settings.aws_s3_bucket,
+        "Key": s3_key,
+        "ContentType": content_type,
+    }
+    if content_length is not None:
+        params["ContentLength"] = content_length
+    if content_md5:
+        params["ContentMD5"] = content_md5
+
     try:
         url = client.generate_presigned_url(
             "put_object",
-            Params={
-                "Bucket": settings.aws_s3_bucket,
-                "Key": s3_key,
-                "ContentType": content_type,
-            },
+            Params=params,
             ExpiresIn=expiration,
         )
         return url
     except ClientError as e:
-        print(f"Error generating presigned upload URL: {e}")
+        logger.error("Error generating presigned upload URL: %s", e)
         return None
 
 
@@ -130,10 +217,17 @@ async def download_file(s3_key: str, local_path: str) -> bool:
         return False
 
     try:
-        client.download_file(settings.aws_s3_bucket, s3_key, local_path)
+        async with _download_slots:
+            await asyncio.to_thread(
+                client.download_file,
+                settings.aws_s3_bucket,
+                s3_key,
+                local_path,
+                Config=TRANSFER_CONFIG,
+            )
         return True
     except ClientError as e:
-        print(f"Error downloading from S3: {e}")
+        logger.error("Error downloading from S3: %s", e)
         return False
 
 
@@ -144,15 +238,17 @@ async def upload_local_file(local_path: str, s3_key: str, content_type: str = "v
         return False
 
     try:
-        client.upload_file(
+        await asyncio.to_thread(
+            client.upload_file,
             local_path,
             settings.aws_s3_bucket,
             s3_key,
             ExtraArgs={"ContentType": content_type},
+            Config=TRANSFER_CONFIG,
         )
         return True
     except ClientError as e:
-        print(f"Error uploading to S3: {e}")
+        logger.error("Error uploading to S3: %s", e)
         return False
 
 
@@ -1,12 +1,17 @@
+import asyncio
+import inspect
+import logging
 import os
-import json
 import tempfile
+import shutil
 import subprocess
-import logging
+from concurrent.futures import ThreadPoolExecutor
+from fractions import Fraction
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Awaitable, NamedTuple, Optional, Union
 
-# Set FFMPEG path for Windows before importing moviepy
+# Set FFMPEG path for Windows
 FFMPEG_PATH = r"C:\ffmpeg\bin\ffmpeg.exe"
 FFPROBE_PATH = r"C:\ffmpeg\bin\ffprobe.exe"
 if os.path.exists(FFMPEG_PATH):
@@ -16,15 +21,90 @@ if os.path.exists(FFMPEG_PATH):
     # Add to PATH as well
     os.environ["PATH"] = r"C:\ffmpeg\bin;" + os.environ.get("PATH", "")
 
-from moviepy import VideoFileClip, TextClip, AudioFileClip, CompositeVideoClip, concatenate_videoclips
-from PIL import ImageFont, ImageDraw, Image
+# Binaries for direct subprocess calls (fall back to PATH lookup)
+FFMPEG_BIN = FFMPEG_PATH if os.path.exists(FFMPEG_PATH) else "ffmpeg"
+FFPROBE_BIN = FFPROBE_PATH if os.path.exists(FFPROBE_PATH) else "ffprobe"
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # stdlib json also accepts bytes
+    from json import loads as json_loads
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from PIL.ImageFont import FreeTypeFont
+
+from config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
 
-# Disable MoviePy logging for faster processing
-logging.getLogger('moviepy').setLevel(logging.CRITICAL)
+# Encoder-specific options, tuned for speed
+ENCODER_PARAMS = {
+    "libx264": ["-preset", "ultrafast"],
+    "h264_nvenc": ["-preset", "p1", "-tune", "ll", "-rc", "vbr", "-cq", "23"],
+    "h264_qsv": ["-preset", "veryfast"],
+}
 
-# Get the backend directory for font paths
+# x264 gains little past ~16 threads; sized to the host to avoid oversubscription
+X264_THREADS = min(os.cpu_count() or 4, 16)
+
+# Each export runs several ffmpeg processes; cap how many render at once so a
+# burst of exports queues up instead of oversubscribing the CPU
+EXPORT_SLOTS = asyncio.Semaphore(max(settings.max_concurrent_exports, 1))
+
+# Get the backend directory for font paths. The bundled fonts are tracked
+# in the repo root's BackEnd/fonts; "backend/fonts" only resolves to it on
+# case-insensitive filesystems, so check both.
 BACKEND_DIR = Path(__file__).parent.parent
-FONTS_DIR = BACKEND_DIR / "fonts"
+FONTS_DIR = next(
+    (d for d in (BACKEND_DIR / "fonts", BACKEND_DIR.parent / "BackEnd" / "fonts") if d.is_dir()),
+    BACKEND_DIR / "fonts",
+)
+FALLBACK_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+
+def _encoder_works(encoder: str) -> bool:
+    """Check an encoder is usable (built in and hardware present) with a tiny test encode."""
+    try:
+        result = subprocess.run(
+            [
+                FFMPEG_BIN,
+                "-hide_banner",
+                "-loglevel", "error",
+                "-f", "lavfi",
+                "-i", "color=size=256x256:duration=0.1",
+                "-c:v", encoder,
+                "-f", "null",
+                "-",
+            ],
+            capture_output=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+@lru_cache(maxsize=1)
+def get_video_encoder() -> str:
+    """H.264 encoder to use: VIDEO_ENCODER setting, else NVENC or QSV if available, else libx264."""
+    if settings.video_encoder:
+        return settings.video_encoder
+    for encoder in ("h264_nvenc", "h264_qsv"):
+        if _encoder_works(encoder):
+            return encoder
+    return "libx264"
+
+
+def get_video_codec_args() -> list[str]:
+    """ffmpeg output arguments for the selected video encoder."""
+    encoder = get_video_encoder()
+    args = ["-c:v", encoder, *ENCODER_PARAMS.get(encoder, [])]
+    if encoder == "libx264":
+        args += ["-threads", str(X264_THREADS)]
+    return args
 
 
 def get_verified_font(font_path: str) -> str:
@@ -35,7 +115,7 @@ def get_verified_font(font_path: str) -> str:
     fallbacks = [
         r"C:\Windows\Fonts\arial.ttf",
         r"C:\Windows\Fonts\Arial.ttf",
-        "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+        FALLBACK_FONT,
     ]
     for fb in fallbacks:
         if os.path.exists(fb):
@@ -43,8 +123,9 @@ def get_verified_font(font_path: str) -> str:
     return "Arial"  # Let MoviePy try to find it
 
 
+@lru_cache(maxsize=1)
 def get_styles():
-    """Returns emotion-based text styles with font paths."""
+    """Returns emotion-based text styles with font paths (built once; treat as read-only)."""
     styles = {
         "neutral":    {"color": "yellow",      "font": str(FONTS_DIR / "Playwrite_NG_Modern/static/PlaywriteNGModern-Regular.ttf")},
         "confident":  {"color": "cyan",        "font": str(FONTS_DIR / "Limelight/Limelight-Regular.ttf")},
@@ -69,46 +150,252 @@ def get_default_font():
     return str(FONTS_DIR / "Playwrite_NG_Modern/static/PlaywriteNGModern-Regular.ttf")
 
 
+@lru_cache(maxsize=1024)
 def time_to_seconds(time_str: str) -> float:
     """Converts HH:MM:SS or MM:SS or SS to total seconds."""
-    parts = time_str.split(':')
-    if len(parts) == 3:
-        h, m, s = map(float, parts)
-        return h * 3600 + m * 60 + s
-    elif len(parts) == 2:
-        m, s = map(float, parts)
-        return m * 60 + s
-    else:
-        return float(parts[0])
+    # Consecutive entries share boundaries (end == next start), so caching halves the parsing
+    total = 0.0
+    for part in time_str.split(':'):
+        total = total * 60 + float(part)
+    return total
 
 
-def get_text_width(text: str, font_size: int = 50, font_path: Optional[str] = None) -> int:
-    """Measure text width using PIL."""
+def parse_transcript(transcript_data: list[dict]) -> tuple[np.ndarray, np.ndarray, list[str], list[str]]:
+    """
+    Convert transcript entries into parallel arrays in one pass.
+    Returns (starts, ends, texts, emotions); timestamps are float64 seconds.
+    """
+    count = len(transcript_data)
+    starts = np.fromiter((time_to_seconds(e['start']) for e in transcript_data), dtype=np.float64, count=count)
+    ends = np.fromiter((time_to_seconds(e['end']) for e in transcript_data), dtype=np.float64, count=count)
+    texts = [e.get('text', '') for e in transcript_data]
+    emotions = [e.get('emotion', 'neutral') for e in transcript_data]
+    return starts, ends, texts, emotions
+
+
+@lru_cache(maxsize=32)
+def get_font(font_path: str, font_size: int) -> "FreeTypeFont":
+    """Load a font once per (path, size); FreeType parsing is the costly part."""
+    # PIL is only needed once subtitles are rendered, keep it off the import path
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype(font_path, font_size)
+    except OSError:
+        # e.g. the bare "Arial" fallback on Linux; measure with a font we
+        # can load rather than failing the whole export
+        logger.warning("[Subtitles] Could not load font %s, using a fallback", font_path)
+    try:
+        return ImageFont.truetype(FALLBACK_FONT, font_size)
+    except OSError:
+        return ImageFont.load_default(font_size)
+
+
+def get_text_width(text: str, font_size: int = 50, font_path: Optional[str] = None) -> float:
+    """Measure text advance width using PIL."""
     if font_path is None:
         font_path = get_default_font()
-    font = ImageFont.truetype(font_path, font_size)
-    img = Image.new('RGB', (1, 1))
-    draw = ImageDraw.Draw(img)
-    bbox = draw.textbbox((0, 0), text, font=font)
-    return bbox[2] - bbox[0]
+    return get_font(font_path, font_size).getlength(text)
 
 
-def resize_and_crop_video(clip: VideoFileClip, target_width: int = 1080, target_height: int = 1920):
-    """Resize and crop video to target dimensions (9:16 vertical)."""
+def chunk_words(words: list[str], font: "FreeTypeFont", max_width: float) -> list[list[str]]:
+    """
+    Greedily group words into chunks that fit within max_width.
+    Each word is measured once; break points are found with a binary
+    search over the cumulative (word + space) widths.
+    """
+    if not words:
+        return []
+
+    space_width = font.getlength(' ')
+    widths = np.fromiter((font.getlength(word) for word in words), dtype=np.float64, count=len(words))
+    # cumulative[i] is the width of words[:i + 1] with a trailing space after each
+    cumulative = np.cumsum(widths + space_width)
+
+    chunks = []
+    start = 0
+    while start < len(words):
+        offset = cumulative[start - 1] if start else 0.0
+        # A chunk's trailing space doesn't count against the limit
+        end = int(np.searchsorted(cumulative, offset + max_width + space_width, side='right'))
+        end = max(end, start + 1)  # an over-wide word still gets its own chunk
+        chunks.append(words[start:end])
+        start = end
+
+    return chunks
+
+
+class VideoProbe(NamedTuple):
+    width: int
+    height: int
+    fps: float
+    codec: str
+    pix_fmt: str
+
+
+def probe_video(video_path: str) -> VideoProbe:
+    """Read size, frame rate and encoding of the first video stream with ffprobe."""
+    result = subprocess.run(
+        [
+            FFPROBE_BIN,
+            "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height,r_frame_rate,codec_name,pix_fmt",
+            "-of", "json",
+            video_path,
+        ],
+        capture_output=True,
+        check=True,
+    )
+    stream = json_loads(result.stdout)["streams"][0]
+    return VideoProbe(
+        int(stream["width"]),
+        int(stream["height"]),
+        float(Fraction(stream["r_frame_rate"])),
+        stream.get("codec_name", ""),
+        stream.get("pix_fmt", ""),
+    )
+
+
+def probe_duration(media_path: str) -> float:
+    """Read container duration in seconds with ffprobe."""
+    result = subprocess.run(
+        [
+            FFPROBE_BIN,
+            "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "json",
+            media_path,
+        ],
+        capture_output=True,
+        check=True,
+    )
+    return float(json_loads(result.stdout)["format"]["duration"])
+
+
+def get_resize_crop_filter(
+    width: int,
+    height: int,
+    target_width: int = 1080,
+    target_height: int = 1920,
+) -> tuple[Optional[str], int, int]:
+    """
+    Build the ffmpeg crop/scale filter that fits a video to the target
+    aspect ratio (center crop to the target ratio, then scale).
+    Returns (filter or None if no change needed, output width, output height).
+    """
     target_ratio = target_width / target_height
-    current_ratio = clip.w / clip.h
+    current_ratio = width / height
+
+    if abs(current_ratio - target_ratio) <= 0.01:
+        return None, width, height
+
+    # Crop in source pixels first so the scaler only processes the kept window
+    if current_ratio > target_ratio:
+        crop_w, crop_h = round(height * target_ratio) // 2 * 2, height
+    else:
+        crop_w, crop_h = width, round(width / target_ratio) // 2 * 2
+    crop_x = (width - crop_w) // 2
+    crop_y = (height - crop_h) // 2
+    return (
+        f"crop={crop_w}:{crop_h}:{crop_x}:{crop_y},scale={target_width}:{target_height}",
+        target_width,
+        target_height,
+    )
+
+
+# Frame rate used when concatenating multiple clips
+MERGE_FPS = 30
+
+
+def _concat_copy(video_paths: list[str], output_path: str) -> None:
+    """Join clips with identical encoding via the concat demuxer (stream copy)."""
+    entries = []
+    for path in video_paths:
+        escaped = os.path.abspath(path).replace("'", "'\\''")
+        # Explicit file: URLs, otherwise entries resolve relative to "pipe:"
+        entries.append(f"file 'file:{escaped}'\n")
+
+    # The list is fed on stdin, so there is no list file to write or clean up
+    ffmpeg_cmd = [
+        FFMPEG_BIN,
+        "-y",
+        "-f", "concat",
+        "-safe", "0",
+        "-protocol_whitelist", "file,pipe",
+        "-i", "pipe:0",
+        "-map", "0:v:0",
+        "-c", "copy",
+        output_path,
+    ]
+    result = subprocess.run(ffmpeg_cmd, input="".join(entries), capture_output=True, text=True)
+
+    if result.returncode != 0:
+        logger.error("[Merge] ffmpeg concat error: %s", result.stderr)
+        raise RuntimeError(f"ffmpeg concat failed with exit code {result.returncode}")
 
-    if abs(current_ratio - target_ratio) > 0.01:
-        if current_ratio > target_ratio:
-            clip = clip.resized(height=target_height)
-            crop_x1 = (clip.w - target_width) / 2
-            clip = clip.cropped(x1=crop_x1, y1=0, x2=crop_x1 + target_width, y2=target_height)
-        else:
-            clip = clip.resized(width=target_width)
-            crop_y1 = (clip.h - target_height) / 2
-            clip = clip.cropped(x1=0, y1=crop_y1, x2=target_width, y2=crop_y1 + target_height)
 
-    return clip
+def fast_concatenate_videos(
+    video_paths: list[str],
+    output_path: str,
+    target_width: int = 1080,
+    target_height: int = 1920,
+) -> str:
+    """
+    Concatenate clips into one video at the target size, audio stripped.
+
+    If every clip already has the target aspect ratio and they share the
+    same size, frame rate, codec and pixel format, they are joined with a
+    stream copy (no re-encode). Otherwise a single
+    ffmpeg filtergraph scales/crops each input and concatenates them in
+    one encode pass.
+    """
+    # ffprobe is mostly process startup, so probe all inputs concurrently
+    with ThreadPoolExecutor(max_workers=min(len(video_paths), 8)) as pool:
+        probes = list(pool.map(probe_video, video_paths))
+    resize_filters = [
+        get_resize_crop_filter(probe.width, probe.height, target_width, target_height)[0]
+        for probe in probes
+    ]
+
+    if all(f is None for f in resize_filters) and len(set(probes)) == 1:
+        logger.info("[Merge] %d clip(s) already conform, stream copying", len(video_paths))
+        _concat_copy(video_paths, output_path)
+        return output_path
+
+    graph = []
+    for i, resize_filter in enumerate(resize_filters):
+        # A plain scale is a passthrough for clips already at the target size,
+        # but keeps concat inputs valid if a clip changes size mid-stream
+        chain = [resize_filter or f"scale={target_width}:{target_height}", "setsar=1"]
+        if len(video_paths) > 1:
+            # Common frame rate keeps concatenated timestamps consistent
+            chain.append(f"fps={MERGE_FPS}")
+        graph.append(f"[{i}:v]{','.join(chain)}[v{i}]")
+    inputs = "".join(f"[v{i}]" for i in range(len(video_paths)))
+    graph.append(f"{inputs}concat=n={len(video_paths)}:v=1:a=0[outv]")
+
+    # Each input's crop/scale chain is independent; let ffmpeg run them on
+    # separate threads instead of one thread walking the whole graph
+    ffmpeg_cmd = [FFMPEG_BIN, "-y", "-filter_complex_threads", str(X264_THREADS)]
+    for path in video_paths:
+        ffmpeg_cmd += ["-i", path]
+    ffmpeg_cmd += [
+        "-filter_complex", ";".join(graph),
+        "-map", "[outv]",
+        *get_video_codec_args(),
+        "-pix_fmt", "yuv420p",
+        "-an",
+        output_path,
+    ]
+
+    logger.debug("[Merge] Running: %s", " ".join(ffmpeg_cmd))
+    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.error("[Merge] ffmpeg error: %s", result.stderr)
+        raise RuntimeError(f"ffmpeg failed with exit code {result.returncode}")
+
+    return output_path
 
 
 def merge_video_clips(video_paths: list[str], output_path: str, target_width: int = 1080, target_height: int = 1920) -> str:
@@ -120,32 +407,100 @@ def merge_video_clips(video_paths: list[str], output_path: str, target_width: in
     if len(video_paths) == 0:
         raise ValueError("No video paths provided")
 
-    if len(video_paths) == 1:
-        # Single clip - just resize and strip audio
-        clip = VideoFileClip(video_paths[0])
-        clip = resize_and_crop_video(clip, target_width, target_height)
-        clip = clip.without_audio()  # Strip original audio
-        clip.write_videofile(output_path, fps=clip.fps, threads=8, preset="ultrafast")
-        clip.close()
-        return output_path
+    return fast_concatenate_videos(video_paths, output_path, target_width, target_height)
 
-    # Multiple clips - resize, strip audio, and concatenate
-    resized_clips = []
-    for path in video_paths:
-        clip = VideoFileClip(path)
-        clip = resize_and_crop_video(clip, target_width, target_height)
-        clip = clip.without_audio()  # Strip original audio
-        resized_clips.append(clip)
 
-    final = concatenate_videoclips(resized_clips, method="chain")
-    final.write_videofile(output_path, fps=final.fps, threads=8, preset="ultrafast")
+# Font weight names (as reported by PIL) -> ASS/libass weight values
+FONT_WEIGHTS = {
+    "thin": 100,
+    "extralight": 200,
+    "light": 300,
+    "regular": 400,
+    "medium": 500,
+    "semibold": 600,
+    "bold": 700,
+    "extrabold": 800,
+    "black": 900,
+}
 
-    # Clean up
-    for clip in resized_clips:
-        clip.close()
-    final.close()
 
-    return output_path
+def get_font_family(font_path: str) -> tuple[str, int]:
+    """Return (family name, weight) of a font file for use in ASS styles."""
+    try:
+        family, style_name = get_font(font_path, 10).getname()
+    except OSError:
+        return Path(font_path).stem, 400
+    return family, FONT_WEIGHTS.get(style_name.replace(" ", "").lower(), 400)
+
+
+def to_ass_color(color: str) -> str:
+    """Convert a color name/hex to ASS &HAABBGGRR format."""
+    from PIL import ImageColor
+
+    r, g, b = ImageColor.getrgb(color)[:3]
+    return f"&H00{b:02X}{g:02X}{r:02X}"
+
+
+def to_ass_time(seconds: float) -> str:
+    """Convert seconds to ASS H:MM:SS.cc timestamp."""
+    centiseconds = max(0, int(round(seconds * 100)))
+    h, rem = divmod(centiseconds, 360000)
+    m, rem = divmod(rem, 6000)
+    s, cs = divmod(rem, 100)
+    return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
+
+
+def escape_ass_text(text: str) -> str:
+    """Keep transcript text from being parsed as ASS override tags."""
+    return text.replace("\\", "\\\u200b").replace("{", "(").replace("}", ")")
+
+
+def build_ass_subtitles(
+    events: list[tuple[float, float, str, str]],
+    styles: dict,
+    width: int,
+    height: int,
+    font_size: int,
+    position: tuple[int, int],
+) -> str:
+    """
+    Build an ASS subtitle document.
+    events: [(start_s, end_s, emotion, text), ...]
+    """
+    lines = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {width}",
+        f"PlayResY: {height}",
+        "WrapStyle: 0",
+        "ScaledBorderAndShadow: yes",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, "
+        "Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+        "Alignment, MarginL, MarginR, MarginV, Encoding",
+    ]
+    for emotion, style in styles.items():
+        family, weight = get_font_family(style["font"])
+        color = to_ass_color(style["color"])
+        lines.append(
+            f"Style: {emotion},{family},{font_size},{color},{color},&H00000000,&H00000000,"
+            f"{weight},0,0,0,100,100,0,0,1,1.5,0,5,0,0,0,1"
+        )
+
+    lines += [
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    pos_x, pos_y = position
+    for start_s, end_s, emotion, text in events:
+        lines.append(
+            f"Dialogue: 0,{to_ass_time(start_s)},{to_ass_time(end_s)},{emotion},,0,0,0,,"
+            f"{{\\pos({pos_x},{pos_y})}}{escape_ass_text(text)}"
+        )
+
+    return "\n".join(lines) + "\n"
 
 
 def add_subtitles_to_video(
@@ -158,6 +513,8 @@ def add_subtitles_to_video(
 ) -> str:
     """
     Add subtitles to video based on transcript data.
+    Subtitles are rendered as an ASS file and burned in with a single
+    ffmpeg pass (resize/crop, subtitles and audio mux together).
 
     transcript_data format:
     [
@@ -165,206 +522,208 @@ def add_subtitles_to_video(
         ...
     ]
     """
-    video = VideoFileClip(video_path)
-    video = resize_and_crop_video(video, target_width, target_height)
+    probe = probe_video(video_path)
+    resize_filter, video_w, video_h = get_resize_crop_filter(probe.width, probe.height, target_width, target_height)
 
     styles = get_styles()
-    subtitle_clips = []
     max_width_ratio = 0.9
     max_height_ratio = 0.2
     font_size = 75
-
-    print(f"[Subtitles] Processing {len(transcript_data)} transcript entries")
-    print(f"[Subtitles] Video dimensions: {video.w}x{video.h}")
-
-    for idx, entry in enumerate(transcript_data):
-        start_s = time_to_seconds(entry['start'])
-        end_s = time_to_seconds(entry['end'])
-        total_duration = end_s - start_s
-
-        if total_duration <= 0:
-            total_duration = 0.5
-
-        words = entry.get('text', '').split()
+    max_width = video_w * max_width_ratio
+
+    logger.info("[Subtitles] Processing %d transcript entries", len(transcript_data))
+    logger.info("[Subtitles] Video dimensions: %dx%d", video_w, video_h)
+
+    starts, ends, texts, emotions = parse_transcript(transcript_data)
+    durations = ends - starts
+    durations[durations <= 0] = 0.5
+
+    # Dynamic chunking based on text width
+    entry_indices = []
+    chunk_texts = []
+    chunk_emotions = []
+    chunk_counts = np.zeros(len(texts), dtype=np.int64)
+    emotions = [emotion if emotion in styles else 'neutral' for emotion in emotions]
+    fonts = {emotion: get_font(styles[emotion]['font'], font_size) for emotion in set(emotions)}
+    for idx, (text, emotion) in enumerate(zip(texts, emotions)):
+        words = text.split()
         if not words:
             continue
 
-        emotion = entry.get('emotion', 'neutral')
-        style = styles.get(emotion, styles['neutral'])
-        text_color = style['color']
-        font_path = style['font']
-
-        # Dynamic chunking based on text width
-        chunks = []
-        current_chunk = []
-        max_width = video.w * max_width_ratio
-
-        for word in words:
-            test_text = ' '.join(current_chunk + [word])
-            if get_text_width(test_text, font_size, font_path) <= max_width:
-                current_chunk.append(word)
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                current_chunk = [word]
+        font = fonts[emotion]
+
+        chunks = chunk_words(words, font, max_width)
+        chunk_counts[idx] = len(chunks)
+        for chunk in chunks:
+            entry_indices.append(idx)
+            chunk_texts.append(' '.join(chunk))
+            chunk_emotions.append(emotion)
+
+    # Each entry's duration is split evenly across its chunks
+    entry_indices = np.asarray(entry_indices, dtype=np.int64)
+    chunk_durations = (durations / np.maximum(chunk_counts, 1))[entry_indices]
+    first_chunk = np.cumsum(chunk_counts) - chunk_counts
+    positions = np.arange(len(entry_indices)) - first_chunk[entry_indices]
+    chunk_starts = starts[entry_indices] + positions * chunk_durations
+    chunk_ends = chunk_starts + chunk_durations
+
+    if chunk_texts:
+        first_style = styles[chunk_emotions[0]]
+        logger.debug("[Subtitles] First subtitle: '%s' at %ss", chunk_texts[0], chunk_starts[0])
+        logger.debug("[Subtitles] Using font: %s, color: %s", first_style["font"], first_style["color"])
+
+    events = list(zip(chunk_starts.tolist(), chunk_ends.tolist(), chunk_emotions, chunk_texts))
+
+    logger.info("[Subtitles] Created %d subtitle events", len(events))
+
+    # Nothing to draw and nothing to resize: skip the encode entirely
+    if not events and resize_filter is None:
+        if audio_path:
+            return mux_audio(video_path, audio_path, output_path)
+        shutil.copyfile(video_path, output_path)
+        return output_path
 
-        if current_chunk:
-            chunks.append(current_chunk)
+    # Subtitle box is centered horizontally, spanning 70%-90% of the height
+    position = (video_w // 2, int(video_h * (0.7 + max_height_ratio / 2)))
+    ass_content = build_ass_subtitles(events, styles, video_w, video_h, font_size, position)
+
+    output_path = os.path.abspath(output_path)
+    with tempfile.TemporaryDirectory(prefix="subs_", ignore_cleanup_errors=True) as work_dir:
+        with open(os.path.join(work_dir, "subs.ass"), "w", encoding="utf-8") as f:
+            f.write(ass_content)
+
+        # Make the style fonts available to libass by file
+        fonts_dir = os.path.join(work_dir, "fonts")
+        os.makedirs(fonts_dir)
+        for style in styles.values():
+            if os.path.exists(style["font"]):
+                shutil.copy(style["font"], fonts_dir)
+
+        # Paths inside the filter are relative to cwd to avoid filtergraph escaping
+        filters = ["ass=subs.ass:fontsdir=fonts"]
+        if resize_filter:
+            filters.insert(0, resize_filter)
+
+        ffmpeg_cmd = [FFMPEG_BIN, "-y", "-i", os.path.abspath(video_path)]
+        if audio_path:
+            ffmpeg_cmd += ["-i", os.path.abspath(audio_path)]
+        ffmpeg_cmd += [
+            "-vf", ",".join(filters),
+            "-map", "0:v:0",
+            *get_video_codec_args(),
+            "-pix_fmt", "yuv420p",
+        ]
+        if audio_path:
+            logger.info("[Audio] Adding audio: %s", audio_path)
+            ffmpeg_cmd += ["-map", "1:a:0", "-c:a", "aac", "-b:a", "192k"]
+        else:
+            ffmpeg_cmd += ["-an"]
+        ffmpeg_cmd.append(output_path)
 
-        num_chunks = len(chunks)
-        if num_chunks == 0:
-            continue
+        logger.debug("[Subtitles] Running: %s", " ".join(ffmpeg_cmd))
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, cwd=work_dir)
 
-        chunk_duration = total_duration / num_chunks
-
-        for i, chunk in enumerate(chunks):
-            chunk_text = ' '.join(chunk)
-            chunk_start = start_s + i * chunk_duration
-
-            if idx == 0 and i == 0:
-                print(f"[Subtitles] First subtitle: '{chunk_text}' at {chunk_start}s")
-                print(f"[Subtitles] Using font: {font_path}, color: {text_color}")
-
-            try:
-                txt_clip = TextClip(
-                    text=chunk_text,
-                    font_size=font_size,
-                    font=font_path,
-                    color=text_color,
-                    stroke_color='black',
-                    stroke_width=1.5,
-                    method='caption',
-                    size=(int(max_width), int(video.h * max_height_ratio))
-                ).with_start(chunk_start).with_duration(chunk_duration).with_position(('center', 0.7), relative=True)
-
-                subtitle_clips.append(txt_clip)
-            except Exception as e:
-                print(f"[Subtitles] Error creating text clip: {e}")
-                # Try with fallback font
-                try:
-                    txt_clip = TextClip(
-                        text=chunk_text,
-                        font_size=font_size,
-                        font="Arial",
-                        color=text_color,
-                        stroke_color='black',
-                        stroke_width=1.5,
-                        method='caption',
-                        size=(int(max_width), int(video.h * max_height_ratio))
-                    ).with_start(chunk_start).with_duration(chunk_duration).with_position(('center', 0.7), relative=True)
-                    subtitle_clips.append(txt_clip)
-                except Exception as e2:
-                    print(f"[Subtitles] Fallback also failed: {e2}")
-
-    # Composite video with subtitles
-    print(f"[Subtitles] Created {len(subtitle_clips)} subtitle clips")
-    final_video = CompositeVideoClip([video] + subtitle_clips)
-
-    # Write video without audio first
-    video_only_path = output_path.replace(".mp4", "_noaudio.mp4")
-    final_video.write_videofile(
-        video_only_path,
-        fps=video.fps,
-        threads=8,
-        preset="ultrafast",
-    )
+    if result.returncode != 0:
+        logger.error("[Subtitles] ffmpeg error: %s", result.stderr)
+        raise RuntimeError(f"ffmpeg failed with exit code {result.returncode}")
 
-    # Close clips to release file handles
-    video.close()
-    final_video.close()
-    for clip in subtitle_clips:
-        clip.close()
-
-    # Add audio using ffmpeg directly (more reliable)
-    if audio_path:
-        print(f"[Audio] Adding audio using ffmpeg: {audio_path}")
-        ffmpeg_cmd = [
-            FFMPEG_PATH,
-            "-y",  # Overwrite output
-            "-i", video_only_path,  # Video input
-            "-i", audio_path,  # Audio input
-            "-c:v", "copy",  # Copy video stream
-            "-c:a", "aac",  # Encode audio as AAC
-            "-b:a", "192k",  # Audio bitrate
-            "-map", "0:v:0",  # Use video from first input
-            "-map", "1:a:0",  # Use audio from second input
-            "-async", "1",  # Sync audio
-            output_path
-        ]
-        print(f"[Audio] Running: {' '.join(ffmpeg_cmd)}")
-        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            print(f"[Audio] ffmpeg error: {result.stderr}")
-            print(f"[Audio] ffmpeg stdout: {result.stdout}")
-            # Fallback - just use video without audio
-            import shutil
-            shutil.move(video_only_path, output_path)
-        else:
-            print(f"[Audio] Audio added successfully")
-            # Clean up video-only file
-            try:
-                os.remove(video_only_path)
-            except:
-                pass
-    else:
-        # No audio - just rename
-        import shutil
-        shutil.move(video_only_path, output_path)
+    return output_path
 
-    # Clean up
-    video.close()
-    final_video.close()
 
+def mux_audio(video_path: str, audio_path: str, output_path: str) -> str:
+    """
+    Add an audio track to a video without re-encoding the video stream.
+    Audio is padded/trimmed to the video length.
+    """
+    ffmpeg_cmd = [
+        FFMPEG_BIN,
+        "-y",
+        "-i", video_path,
+        "-i", audio_path,
+        "-map", "0:v:0",
+        "-map", "1:a:0",
+        "-c:v", "copy",
+        "-c:a", "aac",
+        "-b:a", "192k",
+        "-af", "apad",
+        "-t", f"{probe_duration(video_path):.3f}",
+        output_path,
+    ]
+    logger.debug("[Audio] Running: %s", " ".join(ffmpeg_cmd))
+    result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        logger.error("[Audio] ffmpeg error: %s", result.stderr)
+        raise RuntimeError(f"ffmpeg failed with exit code {result.returncode}")
     return output_path
 
 
 async def process_project_export(
     clip_paths: list[str],
-    transcript_data: list[dict],
+    transcript_data: Union[list[dict], Awaitable[list[dict]]],
     output_path: str,
     audio_path: Optional[str] = None,
     target_width: int = 1080,
     target_height: int = 1920,
 ) -> str:
     """
-    Full export pipeline:
+    Full export pipeline (ffmpeg steps run in worker threads so the event
+    loop keeps serving requests):
     1. Merge clips (audio stripped)
     2. Add subtitles
     3. Add voiceover audio
     4. Return output path
+
+    transcript_data may be an awaitable (e.g. a pending transcription task);
+    it is awaited while the clips merge. At most
+    settings.max_concurrent_exports exports render at a time.
     """
-    print(f"[Export] Starting export with {len(clip_paths)} clips")
-    print(f"[Export] Transcript has {len(transcript_data)} segments")
-    print(f"[Export] Audio path: {audio_path}")
-    print(f"[Export] Fonts dir: {FONTS_DIR}, exists: {FONTS_DIR.exists()}")
-
-    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
-        # Step 1: Merge clips
-        merged_path = os.path.join(temp_dir, "merged.mp4")
-        merge_video_clips(clip_paths, merged_path, target_width, target_height)
-
-        # Step 2: Add subtitles (and audio if provided)
-        if transcript_data:
-            add_subtitles_to_video(
-                merged_path,
-                transcript_data,
-                output_path,
-                audio_path=audio_path,
-                target_width=target_width,
-                target_height=target_height,
-            )
-        else:
-            # No subtitles - just copy merged video
-            if audio_path:
-                # Add audio to merged video
-                video = VideoFileClip(merged_path)
-                audio = AudioFileClip(audio_path)
-                video = video.with_audio(audio)
-                video.write_videofile(output_path, fps=video.fps, threads=8, preset="ultrafast")
-                video.close()
+    logger.info("[Export] Starting export with %d clips", len(clip_paths))
+    logger.info("[Export] Audio path: %s", audio_path)
+    logger.debug("[Export] Fonts dir: %s, exists: %s", FONTS_DIR, FONTS_DIR.exists())
+
+    async with EXPORT_SLOTS:
+        # Next to the output so intermediates use the same scratch filesystem
+        # (and the final shutil.move is a rename)
+        temp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            # Step 1: Merge clips
+            merged_path = os.path.join(temp_dir, "merged.mp4")
+            merge = asyncio.to_thread(merge_video_clips, clip_paths, merged_path, target_width, target_height)
+            if inspect.isawaitable(transcript_data):
+                transcription = asyncio.ensure_future(transcript_data)
+                try:
+                    await merge
+                except BaseException:
+                    # Don't leave the transcription running (or its error unretrieved)
+                    transcription.cancel()
+                    await asyncio.gather(transcription, return_exceptions=True)
+                    raise
+                transcript_data = await transcription
+            else:
+                await merge
+            logger.info("[Export] Transcript has %d segments", len(transcript_data))
+
+            # Step 2: Add subtitles (and audio if provided)
+            if transcript_data:
+                await asyncio.to_thread(
+                    add_subtitles_to_video,
+                    merged_path,
+                    transcript_data,
+                    output_path,
+                    audio_path=audio_path,
+                    target_width=target_width,
+                    target_height=target_height,
+                )
             else:
-                # Just move the merged file
-                import shutil
-                shutil.move(merged_path, output_path)
+                # No subtitles - just copy merged video
+                if audio_path:
+                    # Add audio to merged video (video stream is copied as-is)
+                    await asyncio.to_thread(mux_audio, merged_path, audio_path, output_path)
+                else:
+                    # Just move the merged file
+                    shutil.move(merged_path, output_path)
+        finally:
+            # The merged intermediate is full-size; delete it off the event loop
+            await asyncio.to_thread(shutil.rmtree, temp_dir, ignore_errors=True)
 
     return output_path
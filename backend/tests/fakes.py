@@ -0,0 +1,39 @@
+"""Shared test scaffolding: import path setup, stubs and fake Mongo collections."""
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import importlib.util
+import types
+
+# routers/__init__ imports the export router, whose transcription service
+# isn't part of this tree; none of the route tests call it
+if importlib.util.find_spec("services.transcription") is None:
+    transcription = types.ModuleType("services.transcription")
+    transcription.transcribe_audio = None
+    sys.modules["services.transcription"] = transcription
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return self.docs
+
+
+class FakeDatabase(types.SimpleNamespace):
+    """Database stand-in; pass the fake collections a test needs as keywords."""
+
+
+async def set_session(request, call_next):
+    """Middleware giving every request a fixed anonymous session."""
+    request.state.session_id = "session"
+    return await call_next(request)
+
+
+def start_patches(test, patches):
+    """Start each mock patch and stop it when the test finishes."""
+    for patch in patches:
+        patch.start()
+        test.addCleanup(patch.stop)
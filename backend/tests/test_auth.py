@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+import httpx
+
+from fakes import start_patches
+from middleware import auth
+
+
+def jwks(*kids):
+    return {"keys": [{"kty": "RSA", "kid": kid, "use": "sig", "n": "n", "e": "AQAB"} for kid in kids]}
+
+
+class SigningKeysTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        cache = {"keys": {}, "fetched_at": float("-inf"), "next_fetch_at": float("-inf")}
+        self.now = 1000.0
+        start_patches(self, [
+            mock.patch.object(auth, "_jwks_cache", cache),
+            mock.patch.object(auth.time, "monotonic", lambda: self.now),
+        ])
+
+    async def test_failed_fetch_backs_off(self):
+        get_jwks = mock.AsyncMock(side_effect=httpx.ConnectError("down"))
+        with mock.patch.object(auth, "get_jwks", get_jwks), self.assertLogs(auth.logger, "ERROR"):
+            await auth.get_signing_keys()
+            await auth.get_signing_keys()
+            self.assertEqual(get_jwks.await_count, 1)
+
+            self.now += auth.JWKS_MIN_REFETCH_SECONDS
+            await auth.get_signing_keys()
+            self.assertEqual(get_jwks.await_count, 2)
+
+    async def test_unknown_kid_refetches_rate_limited(self):
+        get_jwks = mock.AsyncMock(return_value=jwks("old"))
+        with mock.patch.object(auth, "get_jwks", get_jwks), \
+                mock.patch.object(auth.jwt, "get_unverified_header", lambda token: {"kid": token}):
+            self.assertEqual((await auth.get_signing_key("old"))["kid"], "old")
+
+            # Rotated key: refetched once the minimum interval has passed
+            get_jwks.return_value = jwks("old", "new")
+            self.assertIsNone(await auth.get_signing_key("new"))
+            self.now += auth.JWKS_MIN_REFETCH_SECONDS
+            self.assertEqual((await auth.get_signing_key("new"))["kid"], "new")
+            self.assertEqual(get_jwks.await_count, 2)
+
+            # Unknown kids don't trigger a fetch per request
+            await auth.get_signing_key("bogus")
+            await auth.get_signing_key("bogus")
+            self.assertEqual(get_jwks.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
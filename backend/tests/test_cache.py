@@ -0,0 +1,40 @@
+import unittest
+from unittest import mock
+
+from fakes import start_patches
+import cache
+from cache import TTLCache
+
+
+class TTLCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        start_patches(self, [mock.patch.object(cache.time, "monotonic", lambda: self.now)])
+
+    def test_entries_expire(self):
+        entries = TTLCache(ttl=10, max_size=10)
+        entries.set("a", 1)
+        entries.set("b", 2, ttl=30)
+        self.now += 20
+        self.assertIsNone(entries.get("a"))
+        self.assertEqual(entries.get("b"), 2)
+        self.assertEqual(len(entries), 1)
+
+    def test_oldest_entries_evicted_by_size(self):
+        entries = TTLCache(ttl=10, max_size=5, size_of=len)
+        entries.set("a", b"12")
+        entries.set("b", b"34")
+        entries.set("a", b"56")
+        entries.set("c", b"78")
+        self.assertIsNone(entries.get("b"))
+        self.assertEqual(entries.get("a"), b"56")
+        self.assertEqual(entries.get("c"), b"78")
+
+    def test_value_larger_than_cache_is_not_stored(self):
+        entries = TTLCache(ttl=10, max_size=2, size_of=len)
+        entries.set("a", b"123")
+        self.assertEqual(len(entries), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
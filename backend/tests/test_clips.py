@@ -0,0 +1,147 @@
+import unittest
+from unittest import mock
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fakes import FakeCursor, FakeDatabase, start_patches
+from middleware import get_current_user
+from routers import clips
+
+PROJECT_ID = ObjectId()
+ASSET_ID = ObjectId()
+
+
+class FakeAssets:
+    def __init__(self, assets):
+        self.assets = {a["_id"]: a for a in assets}
+
+    async def find_one(self, query, projection=None):
+        asset = self.assets.get(query["_id"])
+        if asset and asset["project_id"] == query["project_id"]:
+            return asset
+        return None
+
+    def find(self, query, projection=None):
+        ids = query["_id"]["$in"]
+        return FakeCursor([
+            a for a in self.assets.values()
+            if a["_id"] in ids and a["project_id"] == query["project_id"]
+        ])
+
+
+class FakeProjects:
+    """Applies only the max_clip_order stage of the clip pipelines."""
+
+    def __init__(self, max_clip_order):
+        self.max_clip_order = max_clip_order
+        self.updates = []
+
+    async def find_one_and_update(self, query, pipeline, **kwargs):
+        self.updates.append(pipeline)
+        new_max = pipeline[0]["$set"]["max_clip_order"]
+        self.max_clip_order = self.evaluate(new_max)
+        return {"_id": query["_id"], "max_clip_order": self.max_clip_order}
+
+    async def update_one(self, query, update, **kwargs):
+        self.updates.append(update)
+        for field, value in update.get("$max", {}).items():
+            current = getattr(self, field)
+            setattr(self, field, value if current is None else max(current, value))
+
+    def evaluate(self, expr):
+        if expr == clips.CURRENT_MAX_CLIP_ORDER:
+            return self.max_clip_order
+        if isinstance(expr, dict):
+            (op, args), = expr.items()
+            values = [self.evaluate(a) for a in args]
+            return sum(values) if op == "$add" else max(values)
+        return expr
+
+
+class ClipRoutesTest(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(clips.router)
+        app.dependency_overrides[get_current_user] = lambda: None
+        self.client = TestClient(app)
+        self.db = FakeDatabase(
+            assets=FakeAssets([{"_id": ASSET_ID, "project_id": PROJECT_ID, "duration": 10.0}]),
+            projects=FakeProjects(max_clip_order=3),
+        )
+
+        async def allow_access(project_id, request, user):
+            return PROJECT_ID
+
+        start_patches(self, [
+            mock.patch.object(clips, "get_database", lambda: self.db),
+            mock.patch.object(clips, "require_project_access", allow_access),
+        ])
+
+    def url(self, suffix=""):
+        return f"/projects/{PROJECT_ID}/clips{suffix}"
+
+    def test_add_clip_appends_after_max_order(self):
+        response = self.client.post(self.url(), json={
+            "asset_id": str(ASSET_ID), "start_time": 0, "end_time": 5,
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["order"], 4)
+
+    def test_add_clip_rejects_invalid_times(self):
+        for start, end in [(-1, 5), (5, 5), (0, 11)]:
+            response = self.client.post(self.url(), json={
+                "asset_id": str(ASSET_ID), "start_time": start, "end_time": end,
+            })
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.db.projects.updates, [])
+
+    def test_add_clips_bulk_orders_auto_clips_after_explicit(self):
+        response = self.client.post(self.url("/bulk"), json=[
+            {"asset_id": str(ASSET_ID), "start_time": 0, "end_time": 2},
+            {"asset_id": str(ASSET_ID), "start_time": 2, "end_time": 4, "order": 7},
+            {"asset_id": str(ASSET_ID), "start_time": 4, "end_time": 6},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([c["order"] for c in response.json()], [8, 7, 9])
+        self.assertEqual(len(self.db.projects.updates), 1)
+
+    def test_add_clips_bulk_rejects_unknown_asset(self):
+        response = self.client.post(self.url("/bulk"), json=[
+            {"asset_id": str(ObjectId()), "start_time": 0, "end_time": 2},
+        ])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.db.projects.updates, [])
+
+    def patch_clip_order(self, clip_orders, clip_id, order):
+        project = {"_id": PROJECT_ID, "clips": [
+            {"id": f"c{o}", "asset_id": str(ASSET_ID), "start_time": 0, "end_time": 5, "order": o}
+            for o in clip_orders
+        ]}
+
+        async def load_project(project_id, request, user):
+            return project
+
+        with mock.patch.object(clips, "verify_project_access", load_project):
+            response = self.client.patch(self.url(f"/{clip_id}"), json={"order": order})
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_clip_order_raises_max_clip_order(self):
+        self.patch_clip_order([1, 2, 3], "c1", 9)
+        self.assertEqual(self.db.projects.max_clip_order, 9)
+
+    def test_update_clip_on_project_without_max_clip_order(self):
+        # Projects created before max_clip_order existed don't have the field
+        self.db.projects.max_clip_order = None
+        self.patch_clip_order([1, 2, 3], "c1", 2)
+        self.assertEqual(self.db.projects.max_clip_order, 3)
+
+        response = self.client.post(self.url(), json={
+            "asset_id": str(ASSET_ID), "start_time": 0, "end_time": 5,
+        })
+        self.assertEqual(response.json()["order"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fakes import FakeCursor, FakeDatabase, start_patches
+from middleware import get_current_user
+from routers import export
+
+ASSET_ID = ObjectId()
+PROJECT = {"_id": ObjectId(), "clips": [{"id": "c1", "asset_id": str(ASSET_ID), "order": 1}]}
+
+
+class FakeAssets:
+    def find(self, query):
+        return FakeCursor([{"_id": ASSET_ID, "s3_key": "clips/a.mp4"}])
+
+
+class FakeExports:
+    def __init__(self):
+        self.records = {}
+
+    async def insert_one(self, record):
+        self.records[record["export_id"]] = dict(record)
+
+    async def update_one(self, query, update):
+        self.records[query["export_id"]].update(update["$set"])
+
+    async def find_one(self, query):
+        return self.records.get(query["export_id"])
+
+
+class ExportRoutesTest(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(export.router)
+        app.dependency_overrides[get_current_user] = lambda: None
+        self.client = TestClient(app)
+        self.db = FakeDatabase(assets=FakeAssets(), exports=FakeExports())
+        self.render = mock.AsyncMock(return_value="exports/p/out.mp4")
+
+        async def allow_access(project_id, request, user):
+            return PROJECT
+
+        async def download_url(s3_key, expiration=3600):
+            return f"https://example.com/{s3_key}"
+
+        start_patches(self, [
+            mock.patch.object(export, "get_database", lambda: self.db),
+            mock.patch.object(export, "verify_project_access", allow_access),
+            mock.patch.object(export, "require_project_access", allow_access),
+            mock.patch.object(export, "render_export", self.render),
+            mock.patch.object(export.s3_service, "get_download_url", download_url),
+        ])
+
+    def url(self, suffix=""):
+        return f"/projects/{PROJECT['_id']}/export{suffix}"
+
+    def test_export_waits_and_returns_video_url_by_default(self):
+        response = self.client.post(self.url(), json={})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["video_url"], "https://example.com/exports/p/out.mp4")
+
+    def test_export_failure_returns_500(self):
+        self.render.side_effect = RuntimeError("Video processing failed: boom")
+        with self.assertLogs(export.logger, "ERROR"):
+            response = self.client.post(self.url(), json={})
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json()["detail"], "Video processing failed: boom")
+
+    def test_background_export_can_be_polled(self):
+        response = self.client.post(self.url("?background=true"), json={})
+        self.assertEqual(response.status_code, 202)
+        export_id = response.json()["export_id"]
+
+        status = self.client.get(self.url(f"/{export_id}/status")).json()
+        self.assertEqual(status["status"], "completed")
+        self.assertEqual(status["video_url"], "https://example.com/exports/p/out.mp4")
+
+
+class RenderExportTest(unittest.IsolatedAsyncioTestCase):
+    async def test_transcription_cancelled_when_processing_fails_first(self):
+        transcription_cancelled = asyncio.Event()
+
+        async def transcribe(audio_path):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                transcription_cancelled.set()
+                raise
+
+        async def download(s3_key, path):
+            return True
+
+        async def process(transcript_data, **kwargs):
+            # Waits for an export slot, then fails before awaiting the transcript
+            await asyncio.sleep(0)
+            raise OSError("disk full")
+
+        start_patches(self, [
+            mock.patch.object(export, "auto_transcribe", transcribe),
+            mock.patch.object(export.s3_service, "download_file", download),
+            mock.patch.object(export, "process_project_export", process),
+        ])
+        with self.assertRaises(RuntimeError):
+            await export.render_export(
+                "e1", str(PROJECT["_id"]), PROJECT["clips"],
+                {str(ASSET_ID): {"s3_key": "clips/a.mp4"}},
+                {"s3_key": "voiceover.m4a"}, [],
+            )
+        self.assertTrue(transcription_cancelled.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
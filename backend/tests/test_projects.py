@@ -0,0 +1,61 @@
+import unittest
+from unittest import mock
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pymongo.errors import DuplicateKeyError
+
+from fakes import FakeDatabase, set_session, start_patches
+from middleware import get_current_user, User
+from routers import projects
+
+
+class FakeProjects:
+    """Holds projects in a list; optionally enforces unique titles like the index."""
+
+    def __init__(self, enforce_unique):
+        self.docs = []
+        self.enforce_unique = enforce_unique
+
+    async def find_one(self, query, projection=None):
+        return next((d for d in self.docs if all(d.get(k) == v for k, v in query.items())), None)
+
+    async def insert_one(self, doc):
+        if self.enforce_unique and any(
+            d["user_id"] == doc["user_id"] and d["title"] == doc["title"] for d in self.docs
+        ):
+            raise DuplicateKeyError("E11000 duplicate key error")
+        doc["_id"] = ObjectId()
+        self.docs.append(doc)
+        return mock.Mock(inserted_id=doc["_id"])
+
+
+class CreateProjectTitleTest(unittest.TestCase):
+    def client_for(self, indexed):
+        app = FastAPI()
+        app.include_router(projects.router)
+        app.dependency_overrides[get_current_user] = lambda: User(user_id="auth0|1", email=None)
+        app.middleware("http")(set_session)
+
+        db = FakeDatabase(projects=FakeProjects(enforce_unique=indexed))
+        start_patches(self, [
+            mock.patch.object(projects, "get_database", lambda: db),
+            mock.patch.object(projects, "unique_titles_indexed", lambda: indexed),
+        ])
+        return TestClient(app)
+
+    def assert_duplicate_rejected(self, client):
+        self.assertEqual(client.post("/projects", json={"title": "Trip"}).status_code, 201)
+        response = client.post("/projects", json={"title": "Trip"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_duplicate_title_rejected_by_index(self):
+        self.assert_duplicate_rejected(self.client_for(indexed=True))
+
+    def test_duplicate_title_rejected_without_index(self):
+        self.assert_duplicate_rejected(self.client_for(indexed=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+from datetime import datetime, timezone
+from unittest import mock
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from fakes import FakeDatabase, set_session, start_patches
+from middleware import get_current_user
+from routers import voiceover
+
+PROJECT_ID = ObjectId()
+
+
+class FakeProjects:
+    def __init__(self, old_voiceover):
+        self.voiceover = old_voiceover
+
+    async def find_one_and_update(self, query, update, **kwargs):
+        before = {"_id": PROJECT_ID, "voiceover": self.voiceover}
+        self.voiceover = update["$set"]["voiceover"]
+        return before
+
+
+class ReplaceVoiceoverTest(unittest.TestCase):
+    def setUp(self):
+        app = FastAPI()
+        app.include_router(voiceover.router)
+        app.dependency_overrides[get_current_user] = lambda: None
+        app.middleware("http")(set_session)
+        self.client = TestClient(app)
+        self.events = []
+
+        async def allow_access(project_id, request, user):
+            return PROJECT_ID
+
+        async def upload(**kwargs):
+            self.events.append(("upload", kwargs["s3_key"]))
+            return f"https://example.com/{kwargs['s3_key']}"
+
+        async def delete(s3_key):
+            self.events.append(("delete", s3_key))
+            return True
+
+        async def speech(text):
+            return b"mp3"
+
+        patches = {
+            "require_project_access": allow_access,
+            "upload_file": upload,
+            "delete_file": delete,
+            "generate_speech": speech,
+        }
+        start_patches(self, [mock.patch.object(voiceover, name, value) for name, value in patches.items()])
+
+    def generate(self, old_voiceover):
+        db = FakeDatabase(projects=FakeProjects(old_voiceover))
+        with mock.patch.object(voiceover, "get_database", lambda: db):
+            response = self.client.post(f"/projects/{PROJECT_ID}/voiceover/generate", json={"text": "hi"})
+        self.assertEqual(response.status_code, 200)
+        return db
+
+    def old(self, s3_key):
+        return {"s3_key": s3_key, "s3_url": "", "source": "generated", "created_at": datetime.now(timezone.utc)}
+
+    def test_old_file_deleted_after_new_one_is_saved(self):
+        db = self.generate(self.old("old.mp3"))
+        new_key = db.projects.voiceover["s3_key"]
+        self.assertEqual(self.events, [("upload", new_key), ("delete", "old.mp3")])
+
+    def test_same_key_is_not_deleted(self):
+        frozen = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        key = f"anonymous/session/{PROJECT_ID}/voiceover/20260101_000000_generated.mp3"
+        with mock.patch.object(voiceover, "datetime", mock.Mock(now=lambda tz: frozen)):
+            self.generate(self.old(key))
+        self.assertEqual(self.events, [("upload", key)])
+
+    def test_failed_upload_keeps_old_file(self):
+        async def failed_upload(**kwargs):
+            return None
+
+        with mock.patch.object(voiceover, "upload_file", failed_upload):
+            db = FakeDatabase(projects=FakeProjects(self.old("old.mp3")))
+            with mock.patch.object(voiceover, "get_database", lambda: db):
+                response = self.client.post(f"/projects/{PROJECT_ID}/voiceover/generate", json={"text": "hi"})
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(self.events, [])
+        self.assertEqual(db.projects.voiceover["s3_key"], "old.mp3")
+
+
+if __name__ == "__main__":
+    unittest.main()